@@ -194,22 +194,19 @@ class Aria2Installer:
 
         logger.info(f"配置参数: RPC端口={self.config.rpc_port}, 下载目录={self.config.download_dir}")
 
+        # 先用一次元组前缀匹配筛掉无需替换的行（含注释行），再查找具体的键
+        prefixes = tuple(replacements)
         new_lines: list[str] = []
         for line in content.splitlines():
             stripped = line.lstrip()
-            # 跳过注释行，不进行替换
-            if stripped.startswith("#"):
+            if not stripped.startswith(prefixes):
                 new_lines.append(line)
                 continue
-            replaced = False
             for key, value in replacements.items():
                 if stripped.startswith(key):
                     prefix = line[: len(line) - len(stripped)]
                     new_lines.append(f"{prefix}{key}{value}")
-                    replaced = True
                     break
-            if not replaced:
-                new_lines.append(line)
 
         try:
             ARIA2_CONF.write_text("\n".join(new_lines) + "\n", encoding="utf-8")
@@ -239,6 +236,8 @@ class Aria2Installer:
             "config_dir": str(ARIA2_CONFIG_DIR),
             "config": str(ARIA2_CONF),
             "session": str(ARIA2_SESSION),
+            "rpc_secret": self.config.rpc_secret,
+            "rpc_port": self.config.rpc_port,
             "installed": is_aria2_installed(),
         }
 
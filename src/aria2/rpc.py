@@ -1,8 +1,10 @@
 """aria2 JSON-RPC 2.0 客户端"""
 from __future__ import annotations
 
+import asyncio
 import base64
 import json
+import shutil
 import uuid
 from dataclasses import dataclass
 from pathlib import Path
@@ -10,11 +12,22 @@ from typing import Any
 
 import httpx
 
+from src.core.constants import DOWNLOAD_DIR
 from src.core.exceptions import RpcError
 from src.utils.logger import get_logger
 
 logger = get_logger("rpc")
 
+# 查询任务时请求的字段
+LIST_KEYS = ["gid", "status", "totalLength", "completedLength",
+             "downloadSpeed", "uploadSpeed", "files", "dir"]
+STATUS_KEYS = LIST_KEYS + ["errorMessage"]
+
+# RPC 连接池配置：下载监控每 5 秒轮询一次，空闲连接保留时间需长于轮询间隔才能被复用
+RPC_POOL_LIMITS = httpx.Limits(
+    max_keepalive_connections=10, max_connections=20, keepalive_expiry=30.0
+)
+
 
 def _format_size(size: int) -> str:
     """格式化字节大小"""
@@ -68,26 +81,48 @@ class Aria2RpcClient:
     def __init__(self, host: str = "localhost", port: int = 6800, secret: str = ""):
         self.url = f"http://{host}:{port}/jsonrpc"
         self.secret = secret
+        self._client: httpx.AsyncClient | None = None
+        self._inflight: dict[str, asyncio.Future[DownloadTask]] = {}  # gid -> 进行中的状态查询
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """获取复用的 HTTP 客户端，保持长连接避免每次请求重新握手"""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                timeout=10,
+                limits=RPC_POOL_LIMITS,
+            )
+        return self._client
+
+    async def aclose(self) -> None:
+        """关闭 HTTP 客户端"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def _with_token(self, params: list | None) -> list:
+        """在参数前添加 token 认证"""
+        result = [f"token:{self.secret}"] if self.secret else []
+        if params:
+            result.extend(params)
+        return result
 
     async def _call(self, method: str, params: list | None = None) -> Any:
         """发送 RPC 请求"""
+        return await self._post(method, self._with_token(params))
+
+    async def _post(self, method: str, params: list) -> Any:
+        """发送 JSON-RPC 请求并处理错误"""
         payload = {
             "jsonrpc": "2.0",
             "id": str(uuid.uuid4()),
             "method": method,
-            "params": [],
+            "params": params,
         }
-        # 添加 token 认证
-        if self.secret:
-            payload["params"].append(f"token:{self.secret}")
-        if params:
-            payload["params"].extend(params)
 
         try:
-            async with httpx.AsyncClient(timeout=10) as client:
-                resp = await client.post(self.url, json=payload)
-                resp.raise_for_status()
-                data = resp.json()
+            resp = await self._get_client().post(self.url, json=payload)
+            resp.raise_for_status()
+            data = resp.json()
         except httpx.ConnectError:
             raise RpcError("aria2 服务可能未运行，请先使用 /start 命令启动服务") from None
         except httpx.TimeoutException:
@@ -103,6 +138,26 @@ class Aria2RpcClient:
             raise RpcError(data["error"].get("message", "未知错误"))
         return data.get("result")
 
+    async def _multicall_raw(self, calls: list[tuple[str, list]]) -> list:
+        """执行 system.multicall，返回原始结果（成功为单元素列表，失败为错误结构）"""
+        # system.multicall 本身不需要 token，token 放在每个子调用的参数中
+        methods = [
+            {"methodName": method, "params": self._with_token(params)}
+            for method, params in calls
+        ]
+        return await self._post("system.multicall", [methods])
+
+    async def multicall(self, calls: list[tuple[str, list]]) -> list:
+        """通过 system.multicall 在一次请求中执行多个调用，按顺序返回结果"""
+        results = await self._multicall_raw(calls)
+        values = []
+        for item in results:
+            # 成功的调用结果包装在单元素列表中，失败时为错误结构
+            if isinstance(item, dict):
+                raise RpcError(item.get("message", "未知错误"))
+            values.append(item[0])
+        return values
+
     # === 添加任务 ===
 
     async def add_uri(self, uri: str) -> str:
@@ -143,37 +198,64 @@ class Aria2RpcClient:
     # === 查询任务 ===
 
     async def get_status(self, gid: str) -> DownloadTask:
-        """获取单个任务状态"""
-        keys = ["gid", "status", "totalLength", "completedLength",
-                "downloadSpeed", "uploadSpeed", "files", "errorMessage", "dir"]
-        result = await self._call("aria2.tellStatus", [gid, keys])
+        """获取单个任务状态，同一 GID 的并发查询共用一次请求"""
+        pending = self._inflight.get(gid)
+        if pending is None:
+            pending = asyncio.ensure_future(self._fetch_status(gid))
+            self._inflight[gid] = pending
+            pending.add_done_callback(lambda _: self._inflight.pop(gid, None))
+        # shield 避免某个调用方被取消时连带取消其他调用方共享的请求
+        return await asyncio.shield(pending)
+
+    async def _fetch_status(self, gid: str) -> DownloadTask:
+        """请求单个任务状态"""
+        result = await self._call("aria2.tellStatus", [gid, STATUS_KEYS])
         return self._parse_task(result)
 
+    async def get_statuses(self, gids: list[str]) -> dict[str, DownloadTask | None]:
+        """一次请求批量获取多个任务状态，查询失败（如任务记录已删除）的 GID 对应 None"""
+        results = await self._multicall_raw(
+            [("aria2.tellStatus", [gid, STATUS_KEYS]) for gid in gids]
+        )
+        return {
+            gid: None if isinstance(item, dict) else self._parse_task(item[0])
+            for gid, item in zip(gids, results)
+        }
+
     async def get_active(self) -> list[DownloadTask]:
         """获取活动任务列表"""
-        keys = ["gid", "status", "totalLength", "completedLength",
-                "downloadSpeed", "uploadSpeed", "files", "dir"]
-        result = await self._call("aria2.tellActive", [keys])
+        result = await self._call("aria2.tellActive", [LIST_KEYS])
         return [self._parse_task(t) for t in result]
 
     async def get_waiting(self, offset: int = 0, num: int = 100) -> list[DownloadTask]:
         """获取等待/暂停任务列表"""
-        keys = ["gid", "status", "totalLength", "completedLength",
-                "downloadSpeed", "uploadSpeed", "files", "dir"]
-        result = await self._call("aria2.tellWaiting", [offset, num, keys])
+        result = await self._call("aria2.tellWaiting", [offset, num, LIST_KEYS])
         return [self._parse_task(t) for t in result]
 
     async def get_stopped(self, offset: int = 0, num: int = 100) -> list[DownloadTask]:
         """获取已停止任务列表（完成/错误）"""
-        keys = ["gid", "status", "totalLength", "completedLength",
-                "downloadSpeed", "uploadSpeed", "files", "errorMessage", "dir"]
-        result = await self._call("aria2.tellStopped", [offset, num, keys])
+        result = await self._call("aria2.tellStopped", [offset, num, STATUS_KEYS])
         return [self._parse_task(t) for t in result]
 
     async def get_global_stat(self) -> dict:
         """获取全局统计"""
         return await self._call("aria2.getGlobalStat")
 
+    async def get_overview(self) -> tuple[dict, dict[str, list[DownloadTask]]]:
+        """一次请求获取全局统计和活动/等待/已停止任务列表"""
+        stat, active, waiting, stopped = await self.multicall([
+            ("aria2.getGlobalStat", []),
+            ("aria2.tellActive", [LIST_KEYS]),
+            ("aria2.tellWaiting", [0, 100, LIST_KEYS]),
+            ("aria2.tellStopped", [0, 100, STATUS_KEYS]),
+        ])
+        lists = {
+            "active": [self._parse_task(t) for t in active],
+            "waiting": [self._parse_task(t) for t in waiting],
+            "stopped": [self._parse_task(t) for t in stopped],
+        }
+        return stat, lists
+
     # === 文件操作 ===
 
     async def get_files(self, gid: str) -> list[dict]:
@@ -187,7 +269,6 @@ class Aria2RpcClient:
         try:
             file_path = (Path(task.dir) / task.name).resolve()
             # 安全检查：验证路径在下载目录内，防止路径遍历攻击
-            from src.core.constants import DOWNLOAD_DIR
             download_dir = DOWNLOAD_DIR.resolve()
             try:
                 file_path.relative_to(download_dir)
@@ -196,7 +277,6 @@ class Aria2RpcClient:
                 return False
             if file_path.exists():
                 if file_path.is_dir():
-                    import shutil
                     shutil.rmtree(file_path)
                 else:
                     file_path.unlink()
@@ -41,6 +41,9 @@ RestartSec=5
 WantedBy=default.target
 """
 
+# 反向读取日志时每次读取的块大小
+LOG_TAIL_CHUNK_SIZE = 4096
+
 logger = get_logger("service")
 
 
@@ -81,13 +84,28 @@ class ServiceManagerBase(ABC):
         pass
 
     def view_log(self, lines: int = 50) -> str:
-        """查看日志"""
+        """查看日志末尾若干行
+
+        从文件末尾按块反向读取，读到足够的换行符即停止，避免读入整个日志文件。
+        """
         if lines <= 0 or not ARIA2_LOG.exists():
             return ""
+        chunks: list[bytes] = []
+        newlines = 0
         try:
-            content = ARIA2_LOG.read_text(encoding="utf-8", errors="ignore")
+            with open(ARIA2_LOG, "rb") as f:
+                pos = f.seek(0, os.SEEK_END)
+                # 多读一个换行符，保证最前面的半行被丢弃后仍有完整的 lines 行
+                while pos > 0 and newlines <= lines:
+                    step = min(LOG_TAIL_CHUNK_SIZE, pos)
+                    pos -= step
+                    f.seek(pos)
+                    chunk = f.read(step)
+                    chunks.append(chunk)
+                    newlines += chunk.count(b"\n")
         except OSError as exc:
             raise ServiceError(f"读取日志失败: {exc}") from exc
+        content = b"".join(reversed(chunks)).decode("utf-8", errors="ignore")
         log_lines = content.splitlines(keepends=True)
         return "".join(log_lines[-lines:])
 
@@ -23,6 +23,20 @@ logger = get_logger("onedrive")
 SIMPLE_UPLOAD_LIMIT = 4 * 1024 * 1024  # 4MB，超过此大小使用分块上传
 DEFAULT_CHUNK_SIZE = 5 * 1024 * 1024  # 5MB，必须是 320KB 的倍数
 PROGRESS_UPDATE_INTERVAL = 2.0  # 进度更新间隔（秒）
+STREAM_READ_SIZE = 64 * 1024  # 64KB，分块上传时每次从文件读取的大小
+CHUNK_MAX_RETRIES = 3  # 单个分块的最大尝试次数
+CHUNK_RETRY_STATUS = frozenset((429, 500, 502, 503, 504))  # 可重试的响应状态码
+
+
+def _iter_file_range(f, length: int):
+    """从文件当前位置流式读取 length 字节，避免整块数据驻留内存"""
+    remaining = length
+    while remaining > 0:
+        data = f.read(min(STREAM_READ_SIZE, remaining))
+        if not data:
+            raise IOError("文件在上传过程中被截断")
+        remaining -= len(data)
+        yield data
 
 
 class FileTokenBackend(BaseTokenBackend):
@@ -79,6 +93,19 @@ class OneDriveClient(CloudStorageBase):
         self.config = config
         self._account: Account | None = None
         self._token_backend = FileTokenBackend(CLOUD_TOKEN_DIR / "onedrive_token.json")
+        self._http: httpx.Client | None = None
+
+    def _get_http_client(self) -> httpx.Client:
+        """获取复用的 HTTP 客户端，多次上传共用连接池"""
+        if self._http is None or self._http.is_closed:
+            self._http = httpx.Client(timeout=60.0)
+        return self._http
+
+    def close(self) -> None:
+        """关闭 HTTP 客户端"""
+        if self._http is not None:
+            self._http.close()
+            self._http = None
 
     def _get_account(self) -> Account:
         """获取或创建 Account 实例"""
@@ -268,74 +295,90 @@ class OneDriveClient(CloudStorageBase):
             "Content-Type": "application/json"
         }
 
-        with httpx.Client(timeout=60.0) as client:
-            # 创建上传会话
-            response = client.post(
-                create_session_url,
-                headers=headers,
-                json={"item": {"@microsoft.graph.conflictBehavior": "replace"}}
-            )
+        client = self._get_http_client()
+
+        # 创建上传会话
+        response = client.post(
+            create_session_url,
+            headers=headers,
+            json={"item": {"@microsoft.graph.conflictBehavior": "replace"}}
+        )
+
+        if response.status_code != 200:
+            logger.error(f"创建上传会话失败: {response.status_code} - {response.text}")
+            return False
+
+        session_data = response.json()
+        upload_url = session_data.get("uploadUrl")
+        if not upload_url:
+            logger.error("上传会话响应中没有 uploadUrl")
+            return False
+
+        logger.info(f"创建上传会话成功，开始分块上传: {file_name}")
+
+        # 分块上传
+        uploaded_size = 0
+        last_progress_time = time.time()
+
+        with open(local_path, "rb") as f:
+            while uploaded_size < file_size:
+                chunk_len = min(chunk_size, file_size - uploaded_size)
+                range_start = uploaded_size
+                range_end = uploaded_size + chunk_len - 1
+
+                chunk_headers = {
+                    "Content-Length": str(chunk_len),
+                    "Content-Range": f"bytes {range_start}-{range_end}/{file_size}"
+                }
 
-            if response.status_code != 200:
-                logger.error(f"创建上传会话失败: {response.status_code} - {response.text}")
-                return False
-
-            session_data = response.json()
-            upload_url = session_data.get("uploadUrl")
-            if not upload_url:
-                logger.error("上传会话响应中没有 uploadUrl")
-                return False
-
-            logger.info(f"创建上传会话成功，开始分块上传: {file_name}")
-
-            # 分块上传
-            uploaded_size = 0
-            last_progress_time = time.time()
-
-            with open(local_path, "rb") as f:
-                while uploaded_size < file_size:
-                    chunk_data = f.read(chunk_size)
-                    if not chunk_data:
-                        break
-
-                    chunk_len = len(chunk_data)
-                    range_start = uploaded_size
-                    range_end = uploaded_size + chunk_len - 1
-
-                    chunk_headers = {
-                        "Content-Length": str(chunk_len),
-                        "Content-Range": f"bytes {range_start}-{range_end}/{file_size}"
-                    }
-
-                    chunk_response = client.put(
-                        upload_url,
-                        headers=chunk_headers,
-                        content=chunk_data
-                    )
-
-                    if chunk_response.status_code not in (200, 201, 202):
-                        logger.error(f"上传 chunk 失败: {chunk_response.status_code} - {chunk_response.text}")
-                        return False
-
-                    uploaded_size += chunk_len
-
-                    # 按时间间隔更新进度
-                    current_time = time.time()
-                    if progress_callback and (current_time - last_progress_time >= PROGRESS_UPDATE_INTERVAL):
-                        progress_callback(UploadProgress(
-                            file_name=file_name,
-                            total_size=file_size,
-                            uploaded_size=uploaded_size,
-                            status=UploadStatus.UPLOADING
-                        ))
-                        last_progress_time = current_time
-
-                    if chunk_response.status_code in (200, 201):
-                        logger.info(f"文件上传完成: {file_name}")
-                        break
+                chunk_response = self._put_chunk(client, upload_url, chunk_headers, f, range_start, chunk_len)
+
+                if chunk_response.status_code not in (200, 201, 202):
+                    logger.error(f"上传 chunk 失败: {chunk_response.status_code} - {chunk_response.text}")
+                    return False
+
+                uploaded_size += chunk_len
+
+                # 按时间间隔更新进度
+                current_time = time.time()
+                if progress_callback and (current_time - last_progress_time >= PROGRESS_UPDATE_INTERVAL):
+                    progress_callback(UploadProgress(
+                        file_name=file_name,
+                        total_size=file_size,
+                        uploaded_size=uploaded_size,
+                        status=UploadStatus.UPLOADING
+                    ))
+                    last_progress_time = current_time
+
+                if chunk_response.status_code in (200, 201):
+                    logger.info(f"文件上传完成: {file_name}")
+                    break
 
         return True
 
+    def _put_chunk(
+        self, client: httpx.Client, upload_url: str, headers: dict, f, offset: int, length: int
+    ) -> httpx.Response:
+        """上传单个分块，网络错误或限流/服务端错误时按指数退避重试
+
+        上传会话要求分块按顺序提交，因此只能逐块重试，不能并行上传。
+        """
+        def put() -> httpx.Response:
+            f.seek(offset)
+            # 按 64KB 流式发送当前分块，已显式给出 Content-Length，不会使用 chunked 编码
+            return client.put(upload_url, headers=headers, content=_iter_file_range(f, length))
+
+        for attempt in range(1, CHUNK_MAX_RETRIES):
+            try:
+                response = put()
+                if response.status_code not in CHUNK_RETRY_STATUS:
+                    return response
+                logger.warning(f"上传 chunk 返回 {response.status_code} (尝试 {attempt}/{CHUNK_MAX_RETRIES})")
+            except httpx.TransportError as e:
+                logger.warning(f"上传 chunk 网络错误 (尝试 {attempt}/{CHUNK_MAX_RETRIES}): {e}")
+            time.sleep(2 ** (attempt - 1))
+        return put()
+
     async def _chunked_upload_with_progress(
         self,
         target_folder,
@@ -44,7 +44,7 @@ def detect_arch() -> str:
         return "amd64"
     if machine in {"aarch64", "arm64", "armv8"}:
         return "arm64"
-    if machine.startswith("armv7") or machine.startswith("armv6"):
+    if machine.startswith(("armv7", "armv6")):
         return "armhf"
     if machine in {"i386", "i686", "x86"}:
         return "i386"
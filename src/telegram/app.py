@@ -9,7 +9,7 @@ from telegram.ext import Application
 from src.core import BotConfig, is_aria2_installed
 from src.core.config import apply_saved_config
 from src.aria2.service import Aria2ServiceManager, get_service_mode
-from src.telegram.handlers import Aria2BotAPI, build_handlers
+from src.telegram.handlers import Aria2BotAPI, COMMAND_TABLE, build_handlers
 from src.telegram.handlers.app_ref import set_bot_instance, get_bot_instance
 from src.utils import setup_logger
 
@@ -17,24 +17,7 @@ from src.utils import setup_logger
 _bot_instance: Bot | None = None
 
 # Bot 命令列表，用于 Telegram 命令自动补全
-BOT_COMMANDS = [
-    BotCommand("install", "安装 aria2"),
-    BotCommand("uninstall", "卸载 aria2"),
-    BotCommand("start", "启动 aria2 服务"),
-    BotCommand("stop", "停止 aria2 服务"),
-    BotCommand("restart", "重启 aria2 服务"),
-    BotCommand("status", "查看 aria2 状态"),
-    BotCommand("logs", "查看最近日志"),
-    BotCommand("clear_logs", "清空日志"),
-    BotCommand("set_secret", "设置自定义 RPC 密钥"),
-    BotCommand("reset_secret", "重新生成随机 RPC 密钥"),
-    BotCommand("menu", "显示快捷菜单"),
-    BotCommand("help", "显示帮助"),
-    BotCommand("add", "添加下载任务"),
-    BotCommand("list", "查看下载列表"),
-    BotCommand("stats", "全局下载统计"),
-    BotCommand("cloud", "云存储管理"),
-]
+BOT_COMMANDS = [BotCommand(name, desc) for _, name, _, _, desc in COMMAND_TABLE]
 
 
 async def post_init(application: Application) -> None:
@@ -53,12 +36,17 @@ def create_app(config: BotConfig) -> Application:
     # 应用保存的云存储配置
     apply_saved_config(config.onedrive, config.telegram_channel)
 
-    builder = Application.builder().token(config.token).post_init(post_init)
+    api = Aria2BotAPI(config.aria2, config.allowed_users, config.onedrive, config.telegram_channel, config.api_base_url)
+
+    async def post_shutdown(application: Application) -> None:
+        """应用关闭时停止后台任务"""
+        await api.shutdown()
+
+    builder = Application.builder().token(config.token).post_init(post_init).post_shutdown(post_shutdown)
     if config.api_base_url:
         builder = builder.base_url(config.api_base_url).base_file_url(config.api_base_url + "/file")
     app = builder.build()
 
-    api = Aria2BotAPI(config.aria2, config.allowed_users, config.onedrive, config.telegram_channel, config.api_base_url)
     for handler in build_handlers(api):
         app.add_handler(handler)
 
@@ -108,6 +96,9 @@ def run() -> None:
             await app.start()
             await post_init(app)
             await app.updater.start_polling()
-            await asyncio.Event().wait()
+            try:
+                await asyncio.Event().wait()
+            finally:
+                await app.post_shutdown(app)
 
     asyncio.run(main())
@@ -1,24 +1,26 @@
 """Telegram bot handlers 模块。"""
 from __future__ import annotations
 
-from functools import wraps
-
-from telegram import Update
 from telegram.ext import (
-    ContextTypes,
-    CommandHandler,
     CallbackQueryHandler,
     MessageHandler,
     filters,
 )
 
-from .base import Aria2BotAPIBase, BUTTON_COMMANDS, _get_user_info, _validate_download_url
+from .base import (
+    Aria2BotAPIBase,
+    BUTTON_COMMANDS,
+    BUTTON_COMMAND_KEYS,
+    COMMAND_TABLE,
+    _get_user_info,
+    _validate_download_url,
+)
 from .service import ServiceHandlersMixin
 from .download import DownloadHandlersMixin
 from .cloud_onedrive import OneDriveHandlersMixin
 from .cloud_channel import TelegramChannelHandlersMixin
 from .cloud_coordinator import CloudCoordinatorMixin
-from .callbacks import CallbackHandlersMixin
+from .callbacks import _TEXT_ROUTE_RE, CallbackHandlersMixin
 
 
 class Aria2BotAPI(
@@ -36,80 +38,40 @@ class Aria2BotAPI(
 
 
 def build_handlers(api: Aria2BotAPI) -> list:
-    """构建 Handler 列表"""
-
-    def wrap_with_permission(handler_func):
-        """包装处理函数，添加权限检查"""
-
-        @wraps(handler_func)
-        async def wrapped(update: Update, context: ContextTypes.DEFAULT_TYPE):
-            if not await api._check_permission(update, context):
-                return
-            return await handler_func(update, context)
-
-        return wrapped
-
-    # 构建按钮文本过滤器
-    button_pattern = (
-        "^("
-        + "|".join(BUTTON_COMMANDS.keys()).replace("▶️", "▶️").replace("⏹", "⏹")
-        + ")$"
-    )
-
-    return [
-        # 服务管理命令
-        CommandHandler("install", wrap_with_permission(api.install)),
-        CommandHandler("uninstall", wrap_with_permission(api.uninstall)),
-        CommandHandler("start", wrap_with_permission(api.start_service)),
-        CommandHandler("stop", wrap_with_permission(api.stop_service)),
-        CommandHandler("restart", wrap_with_permission(api.restart_service)),
-        CommandHandler("status", wrap_with_permission(api.status)),
-        CommandHandler("logs", wrap_with_permission(api.view_logs)),
-        CommandHandler("clear_logs", wrap_with_permission(api.clear_logs)),
-        CommandHandler("set_secret", wrap_with_permission(api.set_secret)),
-        CommandHandler("reset_secret", wrap_with_permission(api.reset_secret)),
-        CommandHandler("help", wrap_with_permission(api.help_command)),
-        CommandHandler("menu", wrap_with_permission(api.menu_command)),
-        # 下载管理命令
-        CommandHandler("add", wrap_with_permission(api.add_download)),
-        CommandHandler("list", wrap_with_permission(api.list_downloads)),
-        CommandHandler("stats", wrap_with_permission(api.global_stats)),
-        # 云存储命令
-        CommandHandler("cloud", wrap_with_permission(api.cloud_command)),
+    """构建 Handler 列表，同一 api 实例只构建一次"""
+    if api._handlers is not None:
+        return api._handlers
+    api._handlers = [
+        # 命令统一由命令表分发（权限检查在分发时进行）
+        MessageHandler(filters.COMMAND, api._dispatch_command),
         # Reply Keyboard 按钮文本处理（也处理频道ID输入）
         MessageHandler(
-            filters.TEXT & filters.Regex(button_pattern),
-            wrap_with_permission(api.handle_text_message),
-        ),
-        # 频道ID输入处理（捕获 @channel 或 -100xxx 格式）
-        MessageHandler(
-            filters.TEXT & filters.Regex(r"^(@[\w]+|-?\d+)$"),
-            wrap_with_permission(api.handle_channel_id_input),
+            filters.Text(BUTTON_COMMAND_KEYS),
+            api._guard(api.handle_text_message),
         ),
-        # OneDrive 认证回调 URL 处理
+        # 频道ID输入、OneDrive 认证回调 URL、下载链接共用一个处理器，
+        # 过滤时一次正则匹配，处理时按命中的分组分发
         MessageHandler(
-            filters.TEXT & filters.Regex(r"^https://login\.microsoftonline\.com"),
-            wrap_with_permission(api.handle_auth_callback),
+            filters.TEXT & ~filters.COMMAND & filters.Regex(_TEXT_ROUTE_RE),
+            api._guard(api.handle_text_route),
         ),
         # 种子文件处理
         MessageHandler(
             filters.Document.FileExtension("torrent"),
-            wrap_with_permission(api.handle_torrent),
-        ),
-        # 直接发送链接/磁力链接处理（放在最后，避免拦截其他文本消息）
-        MessageHandler(
-            filters.TEXT & ~filters.COMMAND & filters.Regex(r'(https?://|magnet:\?)'),
-            wrap_with_permission(api.handle_url_message),
+            api._guard(api.handle_torrent),
         ),
         # Callback Query 处理
-        CallbackQueryHandler(wrap_with_permission(api.handle_callback)),
+        CallbackQueryHandler(api._guard(api.handle_callback)),
     ]
+    return api._handlers
 
 
 __all__ = [
     "Aria2BotAPI",
     "build_handlers",
     "BUTTON_COMMANDS",
+    "BUTTON_COMMAND_KEYS",
+    "COMMAND_TABLE",
     "_get_user_info",
     "_validate_download_url",
 ]
@@ -2,6 +2,12 @@
 from __future__ import annotations
 
 import asyncio
+import re
+import shutil
+import time
+from collections import OrderedDict
+from functools import wraps
+from pathlib import Path
 from urllib.parse import urlparse
 
 from telegram import Update
@@ -11,10 +17,15 @@ from src.utils.logger import get_logger
 from src.core import (
     Aria2Config,
     ARIA2_CONF,
+    DOWNLOAD_DIR,
+    is_aria2_installed,
 )
 from src.core.config import OneDriveConfig, TelegramChannelConfig, save_cloud_config
+from src.cloud import OneDriveClient
+from src.cloud.telegram_channel import TelegramChannelClient
 from src.aria2 import Aria2Installer, Aria2ServiceManager
-from src.aria2.rpc import Aria2RpcClient
+from src.aria2.service import ServiceManagerBase
+from src.aria2.rpc import Aria2RpcClient, DownloadTask, _format_size
 
 # Reply Keyboard 按钮文本到命令的映射
 BUTTON_COMMANDS = {
@@ -27,6 +38,55 @@ BUTTON_COMMANDS = {
     "📜 日志": "logs",
     "❓ 帮助": "help",
 }
+# 仅用于成员判断的按钮文本集合
+BUTTON_COMMAND_KEYS = frozenset(BUTTON_COMMANDS)
+
+# 命令表：(分组, 命令, 处理方法名, 参数说明, 描述)
+# 用于命令分发（含 Reply Keyboard 按钮）、设置 Telegram 命令菜单以及生成 /help 文本
+COMMAND_TABLE = (
+    ("服务管理", "install", "install", "", "安装 aria2"),
+    ("服务管理", "uninstall", "uninstall", "", "卸载 aria2"),
+    ("服务管理", "start", "start_service", "", "启动 aria2 服务"),
+    ("服务管理", "stop", "stop_service", "", "停止 aria2 服务"),
+    ("服务管理", "restart", "restart_service", "", "重启 aria2 服务"),
+    ("服务管理", "status", "status", "", "查看 aria2 状态"),
+    ("服务管理", "logs", "view_logs", "", "查看最近日志"),
+    ("服务管理", "clear_logs", "clear_logs", "", "清空日志"),
+    ("服务管理", "set_secret", "set_secret", "<密钥>", "设置自定义 RPC 密钥"),
+    ("服务管理", "reset_secret", "reset_secret", "", "重新生成随机 RPC 密钥"),
+    ("下载管理", "add", "add_download", "<URL>", "添加下载任务"),
+    ("下载管理", "list", "list_downloads", "", "查看下载列表"),
+    ("下载管理", "stats", "global_stats", "", "全局下载统计"),
+    ("云存储", "cloud", "cloud_command", "", "云存储管理菜单"),
+    ("", "menu", "menu_command", "", "显示快捷菜单"),
+    ("", "help", "help_command", "", "显示帮助"),
+)
+
+# 下载 URL 快速校验：scheme 后紧跟主机名的 HTTP/HTTPS URL
+# （对 WHATWG URL 的近似，足以用于 aria2 输入校验，不匹配时再用 urlparse 细查）
+_URL_RE = re.compile(r"^https?://[^\s/?#@:]+[^\s]*$", re.IGNORECASE)
+
+# 需要从 aria2.conf 读取的 RPC 配置项
+_CONF_KEYS = frozenset(("rpc-secret", "rpc-listen-port"))
+
+# 列表菜单预取的任务列表缓存有效期（秒）
+LIST_CACHE_TTL = 3.0
+
+# 同时进行的云存储上传数量上限
+MAX_CONCURRENT_UPLOADS = 3
+
+# aria2 安装状态检测结果的缓存有效期（秒）
+INSTALLED_CACHE_TTL = 5.0
+
+# 同一未授权用户的警告日志和回复最小间隔（秒），以及记录的用户数上限
+DENIED_WARN_INTERVAL = 60.0
+MAX_DENIED_WARN_USERS = 256
+
+# 去重用的 GID 集合最多保留的数量
+MAX_TRACKED_GIDS = 10_000
+
+# Markdown 特殊字符转义表，str.translate 一次遍历完成替换
+_MD_ESCAPE_TABLE = str.maketrans({"_": "\\_", "*": "\\*", "`": "\\`"})
 
 logger = get_logger("handlers")
 
@@ -39,6 +99,110 @@ def _get_user_info(update: Update) -> str:
     return "未知用户"
 
 
+def _get_user_id(update: Update) -> int | None:
+    """获取发送者的用户 ID，只读取一次 effective_user"""
+    user = update.effective_user
+    return user.id if user else None
+
+
+class _BoundedSet:
+    """容量有限的集合，超出容量时淘汰最早加入的元素"""
+
+    __slots__ = ("_items", "_maxlen")
+
+    def __init__(self, maxlen: int):
+        self._items: OrderedDict[str, None] = OrderedDict()
+        self._maxlen = maxlen
+
+    def add(self, item: str) -> None:
+        self._items[item] = None
+        self._items.move_to_end(item)
+        if len(self._items) > self._maxlen:
+            self._items.popitem(last=False)
+
+    def add_new(self, item: str) -> bool:
+        """加入元素，返回此前是否不存在（检查与加入之间没有 await，可用于去重）"""
+        if item in self._items:
+            return False
+        self.add(item)
+        return True
+
+    def __contains__(self, item: object) -> bool:
+        return item in self._items
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
+class _LazyUser:
+    """日志用的用户信息，只有在日志真正输出时才格式化"""
+
+    __slots__ = ("_update", "_text")
+
+    def __init__(self, update: Update):
+        self._update = update
+        self._text: str | None = None
+
+    def __str__(self) -> str:
+        if self._text is None:
+            self._text = _get_user_info(self._update)
+        return self._text
+
+
+def _remove_path(path: Path) -> None:
+    """删除文件或目录（同步，在线程池中执行）"""
+    if path.is_dir():
+        shutil.rmtree(path)
+    else:
+        path.unlink()
+
+
+def _file_size(path: Path) -> int | None:
+    """返回文件大小，文件不存在或无法访问时返回 None（同步，在线程池中执行）"""
+    try:
+        return path.stat().st_size
+    except OSError:
+        return None
+
+
+def _build_help_text() -> str:
+    """根据命令表生成 /help 文本（Markdown）"""
+    lines: list[str] = []
+    current = None
+    for section, name, _, usage, desc in COMMAND_TABLE:
+        if section != current:
+            if current is not None:
+                lines.append("")
+            if section:
+                lines.append(f"*{section}*")
+            current = section
+        command = name.replace("_", "\\_")
+        lines.append(f"/{command} {usage} - {desc}" if usage else f"/{command} - {desc}")
+    return "可用命令：\n" + "\n".join(lines)
+
+
+# /help 文本是静态的，模块加载时生成一次
+_HELP_TEXT = _build_help_text()
+
+
+def _format_global_stats(stat: dict) -> str:
+    """格式化全局统计文本（Markdown）"""
+    get = stat.get
+    return (
+        "📊 *全局统计*\n"
+        f"⬇️ 下载速度: {_format_size(int(get('downloadSpeed', 0)))}/s\n"
+        f"⬆️ 上传速度: {_format_size(int(get('uploadSpeed', 0)))}/s\n"
+        f"▶️ 活动任务: {get('numActive', 0)}\n"
+        f"⏳ 等待任务: {get('numWaiting', 0)}\n"
+        f"⏹️ 已停止: {get('numStopped', 0)}"
+    )
+
+
+def _mask_secret(secret: str) -> str:
+    """生成 RPC 密钥的脱敏显示，仅保留首尾各 4 位"""
+    return f"{secret[:4]}****{secret[-4:] if len(secret) > 8 else '****'}"
+
+
 def _validate_download_url(url: str) -> tuple[bool, str]:
     """验证下载 URL 的有效性，防止恶意输入"""
     # 检查 URL 长度
@@ -49,7 +213,11 @@ def _validate_download_url(url: str) -> tuple[bool, str]:
     if url.startswith("magnet:"):
         return True, ""
 
-    # 验证 HTTP/HTTPS URL
+    # 常见的 HTTP/HTTPS URL 用正则快速通过
+    if _URL_RE.match(url):
+        return True, ""
+
+    # 未匹配时用 urlparse 给出具体的错误原因
     try:
         parsed = urlparse(url)
         if parsed.scheme not in ("http", "https"):
@@ -67,20 +235,41 @@ class Aria2BotAPIBase:
     def __init__(
         self,
         config: Aria2Config | None = None,
-        allowed_users: set[int] | None = None,
+        allowed_users: set[int] | frozenset[int] | None = None,
         onedrive_config: OneDriveConfig | None = None,
         telegram_channel_config: TelegramChannelConfig | None = None,
         api_base_url: str = "",
     ):
         self.config = config or Aria2Config()
-        self.allowed_users = allowed_users or set()
-        self.installer = Aria2Installer(self.config)
-        self.service = Aria2ServiceManager()
+        self.allowed_users = frozenset(allowed_users or ())
+        # 被拒绝用户 -> 上次记录警告的时间，用于限制警告频率
+        self._denied_warn_ts: OrderedDict[int | None, float] = OrderedDict()
+        # 命令名 -> 处理方法，由 _dispatch_command 统一分发
+        self._command_table = {name: getattr(self, attr) for _, name, attr, _, _ in COMMAND_TABLE}
+        self._handlers: list | None = None  # build_handlers 构建结果缓存
+        self._installer: Aria2Installer | None = None
+        self._service: ServiceManagerBase | None = None
         self._rpc: Aria2RpcClient | None = None
-        self._auto_refresh_tasks: dict[str, asyncio.Task] = {}  # chat_id:msg_id -> task
-        self._auto_uploaded_gids: set[str] = set()  # 已自动上传的任务GID，防止重复上传
-        self._download_monitors: dict[str, asyncio.Task] = {}  # gid -> 监控任务
-        self._notified_gids: set[str] = set()  # 已通知的 GID，防止重复通知
+        self._dl_dir_resolved: Path | None = None
+        # chat_id -> (获取时间, {列表类型: 任务列表})，列表菜单预取的结果
+        self._list_cache: dict[int, tuple[float, dict[str, list[DownloadTask]]]] = {}
+        # aria2.conf 解析缓存：(st_mtime_ns, st_size, rpc-secret, rpc-listen-port)
+        self._conf_cache: tuple[int, int, str, int | None] | None = None
+        # (密钥, 脱敏显示)，密钥轮换时随之重建
+        self._masked_secret: tuple[str, str] | None = None
+        # (检测时间, 是否已安装)，安装/卸载时清除
+        self._installed_cache: tuple[float, bool] | None = None
+        # gid -> (详情刷新任务, 唤醒事件)
+        self._auto_refresh_tasks: OrderedDict[str, tuple[asyncio.Task, asyncio.Event]] = OrderedDict()
+        # gid -> {chat_id:msg_id: [message, 上次渲染签名]}，同一任务的详情消息共享刷新
+        self._detail_subscribers: dict[str, dict[str, list]] = {}
+        self._auto_uploaded_gids = _BoundedSet(MAX_TRACKED_GIDS)  # 已自动上传的任务GID，防止重复上传
+        # gid -> (通知的 chat_id, 监控截止时间)，由单个监控任务批量轮询
+        self._download_monitors: dict[str, tuple[int, float]] = {}
+        self._monitor_task: asyncio.Task | None = None
+        self._upload_sem = asyncio.Semaphore(MAX_CONCURRENT_UPLOADS)  # 限制并发上传
+        self._upload_tasks: set[asyncio.Task] = set()  # 进行中的后台上传任务
+        self._notified_gids = _BoundedSet(MAX_TRACKED_GIDS)  # 已通知的 GID，防止重复通知
         # 云存储相关
         self._onedrive_config = onedrive_config
         self._onedrive = None
@@ -89,23 +278,102 @@ class Aria2BotAPIBase:
         self._telegram_channel_config = telegram_channel_config
         self._telegram_channel = None
         self._api_base_url = api_base_url
-        self._channel_uploaded_gids: set[str] = set()  # 已上传到频道的 GID
+        self._channel_uploaded_gids = _BoundedSet(MAX_TRACKED_GIDS)  # 已上传到频道的 GID
         self._pending_channel_input: dict[int, bool] = {}  # 等待用户输入频道ID
 
+    @property
+    def installer(self) -> Aria2Installer:
+        """安装器（首次使用时创建）"""
+        if self._installer is None:
+            self._installer = Aria2Installer(self.config)
+        return self._installer
+
+    @property
+    def service(self) -> ServiceManagerBase:
+        """服务管理器（首次使用时创建）"""
+        if self._service is None:
+            self._service = Aria2ServiceManager()
+        return self._service
+
+    async def shutdown(self) -> None:
+        """停止所有后台刷新和监控任务（应用关闭时调用）"""
+        tasks = [task for task, _ in self._auto_refresh_tasks.values()]
+        if self._monitor_task is not None:
+            tasks.append(self._monitor_task)
+            self._monitor_task = None
+        tasks.extend(self._upload_tasks)
+        self._auto_refresh_tasks.clear()
+        self._detail_subscribers.clear()
+        self._download_monitors.clear()
+        self._upload_tasks.clear()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        logger.info("已停止 %d 个后台任务", len(tasks))
+        if self._rpc is not None:
+            await self._rpc.aclose()
+        if self._onedrive is not None:
+            self._onedrive.close()
+
+    def _spawn_upload(self, coro) -> asyncio.Task:
+        """启动后台上传任务并持有其引用，便于关闭时统一取消"""
+        task = asyncio.create_task(coro)
+        self._upload_tasks.add(task)
+        task.add_done_callback(self._upload_tasks.discard)
+        return task
+
     async def _check_permission(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> bool:
         """检查用户权限，返回 True 表示有权限"""
+        user_id = _get_user_id(update)
+        if user_id is not None and user_id in self.allowed_users:
+            return True
+        # 同一用户被拒绝后一段时间内不再记录日志和回复，避免被刷屏放大
+        now = time.monotonic()
+        last = self._denied_warn_ts.get(user_id)
+        if last is not None and now - last < DENIED_WARN_INTERVAL:
+            return False
+        self._denied_warn_ts[user_id] = now
+        self._denied_warn_ts.move_to_end(user_id)
+        while len(self._denied_warn_ts) > MAX_DENIED_WARN_USERS:
+            self._denied_warn_ts.popitem(last=False)
         # 未配置白名单时拒绝所有用户
         if not self.allowed_users:
-            logger.warning(f"未配置 ALLOWED_USERS，拒绝访问 - {_get_user_info(update)}")
+            logger.warning("未配置 ALLOWED_USERS，拒绝访问 - %s", _LazyUser(update))
             await self._reply(update, context, "⚠️ Bot 未配置允许的用户，请联系管理员")
             return False
-        user_id = update.effective_user.id if update.effective_user else None
-        if user_id and user_id in self.allowed_users:
-            return True
-        logger.warning(f"未授权访问 - {_get_user_info(update)}")
+        logger.warning("未授权访问 - %s", _LazyUser(update))
         await self._reply(update, context, "🚫 您没有权限使用此 Bot")
         return False
 
+    def _guard(self, handler):
+        """包装处理函数，先检查权限再执行"""
+        check = self._check_permission
+
+        @wraps(handler)
+        async def guarded(update: Update, context: ContextTypes.DEFAULT_TYPE):
+            if await check(update, context):
+                return await handler(update, context)
+
+        return guarded
+
+    async def _dispatch_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+        """按命令表分发命令消息，替代逐个匹配的 CommandHandler"""
+        message = update.effective_message
+        if message is None or not message.text:
+            return
+        words = message.text.split()
+        command, _, target = words[0][1:].partition("@")
+        # /cmd@botname 形式只处理发给本 bot 的命令
+        if target and target.lower() != (context.bot.username or "").lower():
+            return
+        handler = self._command_table.get(command.lower())
+        if handler is None:
+            return
+        if not await self._check_permission(update, context):
+            return
+        context.args = words[1:]
+        await handler(update, context)
+
     def _get_rpc_client(self) -> Aria2RpcClient:
         """获取或创建 RPC 客户端"""
         if self._rpc is None:
@@ -114,11 +382,44 @@ class Aria2BotAPIBase:
             self._rpc = Aria2RpcClient(port=port, secret=secret)
         return self._rpc
 
+    async def _fetch_list_overview(self, rpc: Aria2RpcClient, chat_id: int) -> dict:
+        """获取全局统计并预取各类任务列表，返回全局统计"""
+        stat, lists = await rpc.get_overview()
+        self._list_cache[chat_id] = (time.monotonic(), lists)
+        return stat
+
+    def _get_cached_tasks(self, chat_id: int, list_type: str) -> list[DownloadTask] | None:
+        """获取预取的任务列表，过期或不存在时返回 None"""
+        cached = self._list_cache.get(chat_id)
+        if cached is None:
+            return None
+        if time.monotonic() - cached[0] > LIST_CACHE_TTL:
+            del self._list_cache[chat_id]
+            return None
+        return cached[1].get(list_type)
+
+    def _get_download_dir(self) -> Path:
+        """获取解析后的下载目录（只解析一次）"""
+        if self._dl_dir_resolved is None:
+            self._dl_dir_resolved = DOWNLOAD_DIR.resolve()
+        return self._dl_dir_resolved
+
+    def _is_installed_cached(self) -> bool:
+        """检测 aria2 是否已安装，短时间内重复调用直接返回缓存结果"""
+        now = time.monotonic()
+        cached = self._installed_cache
+        if cached is not None and now - cached[0] < INSTALLED_CACHE_TTL:
+            return cached[1]
+        installed = is_aria2_installed()
+        self._installed_cache = (now, installed)
+        return installed
+
     def _get_onedrive_client(self):
         """获取或创建 OneDrive 客户端"""
         if self._onedrive is None and self._onedrive_config and self._onedrive_config.enabled:
-            from src.cloud.onedrive import OneDriveClient
-
+            if OneDriveClient is None:
+                logger.error("OneDrive 依赖 O365 未安装，无法创建 OneDrive 客户端")
+                return None
             self._onedrive = OneDriveClient(self._onedrive_config)
         return self._onedrive
 
@@ -129,8 +430,6 @@ class Aria2BotAPIBase:
             and self._telegram_channel_config
             and self._telegram_channel_config.enabled
         ):
-            from src.cloud.telegram_channel import TelegramChannelClient
-
             is_local_api = bool(self._api_base_url)
             self._telegram_channel = TelegramChannelClient(
                 self._telegram_channel_config, bot, is_local_api
@@ -142,22 +441,20 @@ class Aria2BotAPIBase:
         self._telegram_channel = None
         return self._get_telegram_channel_client(bot)
 
-    async def _delete_local_file(self, local_path, gid: str) -> tuple[bool, str]:
-        """删除本地文件，返回 (成功, 消息)"""
-        import shutil
-        from pathlib import Path
+    async def _get_file_size(self, path: Path) -> int | None:
+        """在线程池中获取文件大小，文件不存在时返回 None，避免慢速磁盘上的 stat 阻塞事件循环"""
+        return await asyncio.get_running_loop().run_in_executor(None, _file_size, path)
 
-        if isinstance(local_path, str):
-            local_path = Path(local_path)
+    async def _delete_local_file(self, local_path: Path, gid: str) -> tuple[bool, str]:
+        """删除本地文件，返回 (成功, 消息)"""
         try:
-            if local_path.is_dir():
-                shutil.rmtree(local_path)
-            else:
-                local_path.unlink()
-            logger.info(f"已删除本地文件 GID={gid}: {local_path}")
+            # 删除大目录可能耗时数秒，放到线程池中执行避免阻塞事件循环；
+            # 删除操作不依赖 contextvars，直接用 run_in_executor 省去 to_thread 的上下文复制
+            await asyncio.get_running_loop().run_in_executor(None, _remove_path, local_path)
+            logger.info("已删除本地文件 GID=%s: %s", gid, local_path)
             return True, "🗑️ 本地文件已删除"
         except Exception as e:
-            logger.error(f"删除本地文件失败 GID={gid}: {e}")
+            logger.error("删除本地文件失败 GID=%s: %s", gid, e)
             return False, f"⚠️ 删除本地文件失败: {e}"
 
     def _save_cloud_config(self) -> bool:
@@ -169,52 +466,90 @@ class Aria2BotAPIBase:
     async def _reply(
         self, update: Update, context: ContextTypes.DEFAULT_TYPE, text: str, **kwargs
     ):
-        if update.effective_message:
-            return await update.effective_message.reply_text(text, **kwargs)
-        if update.effective_chat:
-            return await context.bot.send_message(
-                chat_id=update.effective_chat.id, text=text, **kwargs
-            )
+        # effective_* 为属性，每次访问都会重新查找，这里只读取一次
+        message = update.effective_message
+        if message is not None:
+            return await message.reply_text(text, **kwargs)
+        chat = update.effective_chat
+        if chat is not None:
+            return await context.bot.send_message(chat_id=chat.id, text=text, **kwargs)
         return None
 
     async def _delayed_delete_messages(self, messages: list, delay: int = 5) -> None:
-        """延迟删除多条消息"""
+        """延迟删除多条消息（并发删除）"""
         try:
             await asyncio.sleep(delay)
-            for msg in messages:
-                try:
-                    await msg.delete()
-                except Exception as e:
-                    logger.warning(f"删除消息失败: {e}")
+            results = await asyncio.gather(*(m.delete() for m in messages), return_exceptions=True)
+            for result in results:
+                if isinstance(result, Exception):
+                    logger.warning("删除消息失败: %s", result)
             logger.debug("已删除敏感认证消息")
         except Exception as e:
-            logger.warning(f"延迟删除任务失败: {e}")
+            logger.warning("延迟删除任务失败: %s", e)
+
+    def _load_conf(self) -> tuple[str, int | None] | None:
+        """读取 aria2.conf 中的 RPC 密钥和端口，文件未变化时直接返回缓存"""
+        try:
+            st = ARIA2_CONF.stat()
+        except OSError:
+            self._conf_cache = None
+            return None
+        cache = self._conf_cache
+        if cache is not None and cache[0] == st.st_mtime_ns and cache[1] == st.st_size:
+            return cache[2], cache[3]
+        values: dict[str, str] = {}
+        try:
+            # 逐行读取，两个键都拿到后即停止，避免整份配置（含超长 bt-tracker）读入内存
+            with ARIA2_CONF.open("r", encoding="utf-8", errors="ignore") as f:
+                for line in f:
+                    key, sep, value = line.partition("=")
+                    if not sep:
+                        continue
+                    key = key.strip()
+                    if key not in _CONF_KEYS or key in values:
+                        continue
+                    value = value.strip()
+                    # 与原逻辑一致：取第一个有效的密钥/端口
+                    if value and (key == "rpc-secret" or value.isdigit()):
+                        values[key] = value
+                        if len(values) == len(_CONF_KEYS):
+                            break
+        except OSError:
+            return None
+        secret = values.get("rpc-secret", "")
+        port = int(values["rpc-listen-port"]) if "rpc-listen-port" in values else None
+        self._conf_cache = (st.st_mtime_ns, st.st_size, secret, port)
+        return secret, port
+
+    def _invalidate_rpc_config(self) -> None:
+        """RPC 配置变更后清除配置缓存，并让已创建的 RPC 客户端使用新密钥"""
+        self._conf_cache = None
+        self._masked_secret = None
+        if self._rpc is not None:
+            self._rpc.secret = self._get_rpc_secret()
 
     def _get_rpc_secret(self) -> str:
         if self.config.rpc_secret:
             return self.config.rpc_secret
-        if ARIA2_CONF.exists():
-            try:
-                for line in ARIA2_CONF.read_text(encoding="utf-8", errors="ignore").splitlines():
-                    stripped = line.strip()
-                    if stripped.startswith("rpc-secret="):
-                        secret = stripped.split("=", 1)[1].strip()
-                        if secret:
-                            self.config.rpc_secret = secret
-                            return secret
-            except OSError:
-                return ""
-        return ""
+        conf = self._load_conf()
+        if conf is None:
+            return ""
+        secret = conf[0]
+        if secret:
+            self.config.rpc_secret = secret
+        return secret
+
+    def _get_masked_secret(self, secret: str | None = None) -> str:
+        """返回 RPC 密钥的脱敏显示，同一密钥只计算一次"""
+        if secret is None:
+            secret = self._get_rpc_secret() or "未设置"
+        cached = self._masked_secret
+        if cached is None or cached[0] != secret:
+            cached = self._masked_secret = (secret, _mask_secret(secret))
+        return cached[1]
 
     def _get_rpc_port(self) -> int | None:
-        if ARIA2_CONF.exists():
-            try:
-                for line in ARIA2_CONF.read_text(encoding="utf-8", errors="ignore").splitlines():
-                    stripped = line.strip()
-                    if stripped.startswith("rpc-listen-port="):
-                        port_str = stripped.split("=", 1)[1].strip()
-                        if port_str.isdigit():
-                            return int(port_str)
-            except OSError:
-                return None
+        conf = self._load_conf()
+        if conf is not None and conf[1] is not None:
+            return conf[1]
         return self.config.rpc_port
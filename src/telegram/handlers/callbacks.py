@@ -2,8 +2,11 @@
 from __future__ import annotations
 
 import asyncio
+import re
+import time
 
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
+from telegram.error import BadRequest
 from telegram.ext import ContextTypes
 
 from src.utils.logger import get_logger
@@ -12,6 +15,7 @@ from src.aria2.rpc import Aria2RpcClient, DownloadTask, _format_size
 from src.telegram.keyboards import (
     STATUS_EMOJI,
     build_list_type_keyboard,
+    build_task_list_keyboard,
     build_delete_confirm_keyboard,
     build_cloud_settings_keyboard,
     build_detail_keyboard_with_upload,
@@ -21,10 +25,62 @@ from src.telegram.keyboards import (
     build_cloud_menu_keyboard,
 )
 
-from .base import BUTTON_COMMANDS, _get_user_info
+from .app_ref import get_bot_instance
+from .base import BUTTON_COMMANDS, _MD_ESCAPE_TABLE, _format_global_stats, _get_user_id, _get_user_info
+from .cloud_onedrive import _MS_AUTH_PREFIX
 
 logger = get_logger("handlers.callbacks")
 
+# 同时进行自动刷新的详情任务上限
+MAX_AUTO_REFRESH_TASKS = 50
+
+# 详情自动刷新：正常间隔、内容无变化时退避的最大间隔、无操作时的刷新时长（秒）
+DETAIL_REFRESH_INTERVAL = 2.0
+DETAIL_REFRESH_MAX_INTERVAL = 15.0
+DETAIL_REFRESH_DURATION = 120.0
+
+# 已停止（不在下载队列中）的任务状态
+_STOPPED_STATUSES = frozenset(("complete", "error", "removed"))
+
+# 回调动作 -> 回调数据至少需要的段数
+_REQUIRED_PARTS = {
+    "pause": 2,
+    "resume": 2,
+    "delete": 2,
+    "detail": 2,
+    "refresh": 2,
+    "confirm_del": 3,
+    "cancel_del": 3,
+}
+
+# 非命令文本路由：频道ID输入、OneDrive 认证回调 URL、下载链接，一次匹配即可确定去向
+_TEXT_ROUTE_RE = re.compile(
+    r"^(?:(?P<channel>@\w+|-?\d+)$|(?P<auth>" + re.escape(_MS_AUTH_PREFIX) + r"))"
+    r"|(?P<link>https?://|magnet:\?)",
+    re.ASCII,
+)
+
+# 任务列表每页显示的任务数
+TASK_LIST_PAGE_SIZE = 5
+
+# 静态的“返回列表”按钮行和键盘，只构建一次
+_BACK_TO_MENU_ROW = [InlineKeyboardButton("🔙 返回列表", callback_data="list:menu")]
+_BACK_TO_MENU_MARKUP = InlineKeyboardMarkup([_BACK_TO_MENU_ROW])
+
+
+def _build_task_row(gid: str, status: str) -> list[InlineKeyboardButton]:
+    """构建任务列表中单个任务的操作按钮行"""
+    short_gid = gid[:6]
+    row = [
+        InlineKeyboardButton(f"🗑 {short_gid}", callback_data=f"delete:{gid}"),
+        InlineKeyboardButton(f"📋 {short_gid}", callback_data=f"detail:{gid}"),
+    ]
+    if status == "active":
+        row.insert(0, InlineKeyboardButton(f"⏸ {short_gid}", callback_data=f"pause:{gid}"))
+    elif status in ("paused", "waiting"):
+        row.insert(0, InlineKeyboardButton(f"▶️ {short_gid}", callback_data=f"resume:{gid}"))
+    return row
+
 
 class CallbackHandlersMixin:
     """回调处理 Mixin"""
@@ -40,27 +96,29 @@ class CallbackHandlersMixin:
         # 然后检查是否是按钮点击
         await self.handle_button_text(update, context)
 
+    async def handle_text_route(
+        self, update: Update, context: ContextTypes.DEFAULT_TYPE
+    ) -> None:
+        """按 _TEXT_ROUTE_RE 的匹配结果分发频道ID输入、认证回调和下载链接"""
+        route = context.matches[0].lastgroup if context.matches else None
+        if route == "channel":
+            await self.handle_channel_id_input(update, context)
+        elif route == "auth":
+            await self.handle_auth_callback(update, context)
+        elif route == "link":
+            await self.handle_url_message(update, context)
+
     async def handle_button_text(
         self, update: Update, context: ContextTypes.DEFAULT_TYPE
     ) -> None:
         """处理 Reply Keyboard 按钮点击"""
-        text = update.message.text
-        if text not in BUTTON_COMMANDS:
+        command = BUTTON_COMMANDS.get(update.message.text)
+        if command is None:
             return
-
-        cmd = BUTTON_COMMANDS[text]
-        handler_map = {
-            "list": self.list_downloads,
-            "stats": self.global_stats,
-            "start": self.start_service,
-            "stop": self.stop_service,
-            "restart": self.restart_service,
-            "status": self.status,
-            "logs": self.view_logs,
-            "help": self.help_command,
-        }
-        if cmd in handler_map:
-            await handler_map[cmd](update, context)
+        # 与命令消息共用同一张命令表，按钮点击与对应命令走相同的处理路径
+        handler = self._command_table.get(command)
+        if handler is not None:
+            await handler(update, context)
 
     async def handle_callback(
         self, update: Update, context: ContextTypes.DEFAULT_TYPE
@@ -71,29 +129,17 @@ class CallbackHandlersMixin:
         try:
             await query.answer()
         except Exception as e:
-            logger.warning(f"回调应答失败 (可忽略): {e}")
+            logger.warning("回调应答失败 (可忽略): %s", e)
 
         data = query.data
         if not data:
             return
 
-        parts = data.split(":")
-        if not parts:
-            await query.edit_message_text("❌ 无效操作")
-            return
-        action = parts[0]
+        # 大多数回调是 "动作:GID" 两段格式，用 partition 取参数，只有多段回调才完整拆分
+        action, _, arg = data.partition(":")
 
         # 安全检查：验证回调数据格式，防止索引越界
-        required_parts = {
-            "pause": 2,
-            "resume": 2,
-            "delete": 2,
-            "detail": 2,
-            "refresh": 2,
-            "confirm_del": 3,
-            "cancel_del": 3,
-        }
-        if action in required_parts and len(parts) < required_parts[action]:
+        if data.count(":") + 1 < _REQUIRED_PARTS.get(action, 0):
             await query.edit_message_text("❌ 无效操作")
             return
 
@@ -106,28 +152,27 @@ class CallbackHandlersMixin:
             rpc = self._get_rpc_client()
 
             if action == "list":
-                await self._handle_list_callback(query, rpc, parts)
+                await self._handle_list_callback(query, rpc, data.split(":"))
             elif action == "pause":
-                await self._handle_pause_callback(query, rpc, parts[1])
+                await self._handle_pause_callback(query, rpc, arg)
             elif action == "resume":
-                await self._handle_resume_callback(query, rpc, parts[1])
+                await self._handle_resume_callback(query, rpc, arg)
             elif action == "delete":
-                await self._handle_delete_callback(query, parts[1])
+                await self._handle_delete_callback(query, arg)
             elif action == "confirm_del":
+                parts = data.split(":")
                 await self._handle_confirm_delete_callback(query, rpc, parts[1], parts[2])
-            elif action == "detail":
-                await self._handle_detail_callback(query, rpc, parts[1])
-            elif action == "refresh":
-                await self._handle_detail_callback(query, rpc, parts[1])
+            elif action == "detail" or action == "refresh":
+                await self._handle_detail_callback(query, rpc, arg)
             elif action == "stats":
                 await self._handle_stats_callback(query, rpc)
             elif action == "cancel":
                 await query.edit_message_text("❌ 操作已取消")
             # 云存储相关回调
             elif action == "cloud":
-                await self._handle_cloud_callback(query, update, context, parts)
+                await self._handle_cloud_callback(query, update, context, data.split(":"))
             elif action == "upload":
-                await self._handle_upload_callback(query, update, context, parts)
+                await self._handle_upload_callback(query, update, context, data.split(":"))
 
         except RpcError as e:
             await query.edit_message_text(f"❌ 操作失败: {e}")
@@ -136,8 +181,9 @@ class CallbackHandlersMixin:
         self, query, rpc: Aria2RpcClient, parts: list
     ) -> None:
         """处理列表相关回调"""
+        chat_id = query.message.chat_id
         if parts[1] == "menu":
-            stat = await rpc.get_global_stat()
+            stat = await self._fetch_list_overview(rpc, chat_id)
             keyboard = build_list_type_keyboard(
                 int(stat.get("numActive", 0)),
                 int(stat.get("numWaiting", 0)),
@@ -149,14 +195,19 @@ class CallbackHandlersMixin:
         list_type = parts[1]
         page = int(parts[2]) if len(parts) > 2 else 1
 
+        # 优先使用列表菜单刚预取的结果，省去一次 RPC
+        tasks = self._get_cached_tasks(chat_id, list_type)
         if list_type == "active":
-            tasks = await rpc.get_active()
+            if tasks is None:
+                tasks = await rpc.get_active()
             title = "▶️ 活动任务"
         elif list_type == "waiting":
-            tasks = await rpc.get_waiting()
+            if tasks is None:
+                tasks = await rpc.get_waiting()
             title = "⏳ 等待任务"
         else:  # stopped
-            tasks = await rpc.get_stopped()
+            if tasks is None:
+                tasks = await rpc.get_stopped()
             title = "✅ 已完成/错误"
 
         await self._send_task_list(query, tasks, page, list_type, title)
@@ -165,56 +216,35 @@ class CallbackHandlersMixin:
         self, query, tasks: list[DownloadTask], page: int, list_type: str, title: str
     ) -> None:
         """发送任务列表"""
-        page_size = 5
-        total_pages = max(1, (len(tasks) + page_size - 1) // page_size)
-        start = (page - 1) * page_size
-        page_tasks = tasks[start : start + page_size]
-
         if not tasks:
-            from src.telegram.keyboards import build_task_list_keyboard
-
             keyboard = build_task_list_keyboard(1, 1, list_type)
             await query.edit_message_text(f"{title}\n\n📭 暂无任务", reply_markup=keyboard)
             return
 
+        total_pages = (len(tasks) + TASK_LIST_PAGE_SIZE - 1) // TASK_LIST_PAGE_SIZE
+        start = (page - 1) * TASK_LIST_PAGE_SIZE
+        page_tasks = tasks[start : start + TASK_LIST_PAGE_SIZE]
+
         lines = [f"{title} ({page}/{total_pages})\n"]
+        # 一次遍历同时生成文本和每个任务的操作按钮
+        keyboard_rows = []
+        get_emoji = STATUS_EMOJI.get
         for t in page_tasks:
-            emoji = STATUS_EMOJI.get(t.status, "❓")
-            lines.append(f"{emoji} {t.name}")
-            lines.append(f"   {t.progress_bar} {t.progress:.1f}%")
-            lines.append(f"   {t.size_str} | {t.speed_str}")
+            gid = t.gid
+            status = t.status
+            block = [
+                f"{get_emoji(status, '❓')} {t.name}",
+                f"   {t.progress_bar} {t.progress:.1f}%",
+                f"   {t.size_str} | {t.speed_str}",
+            ]
             # 添加操作按钮提示
-            if t.status == "active":
-                lines.append(f"   ⏸ /pause\\_{t.gid[:8]}")
-            elif t.status in ("paused", "waiting"):
-                lines.append(f"   ▶️ /resume\\_{t.gid[:8]}")
-            lines.append(f"   📋 详情: 点击下方按钮\n")
-
-        # 为每个任务添加操作按钮
-        task_buttons = []
-        for t in page_tasks:
-            row = []
-            if t.status == "active":
-                row.append(
-                    {"text": f"⏸ {t.gid[:6]}", "callback_data": f"pause:{t.gid}"}
-                )
-            elif t.status in ("paused", "waiting"):
-                row.append(
-                    {"text": f"▶️ {t.gid[:6]}", "callback_data": f"resume:{t.gid}"}
-                )
-            row.append({"text": f"🗑 {t.gid[:6]}", "callback_data": f"delete:{t.gid}"})
-            row.append({"text": f"📋 {t.gid[:6]}", "callback_data": f"detail:{t.gid}"})
-            task_buttons.append(row)
-
-        # 构建完整键盘
-        keyboard_rows = []
-        for row in task_buttons:
-            keyboard_rows.append(
-                [
-                    InlineKeyboardButton(b["text"], callback_data=b["callback_data"])
-                    for b in row
-                ]
-            )
+            if status == "active":
+                block.append(f"   ⏸ /pause\\_{gid[:8]}")
+            elif status in ("paused", "waiting"):
+                block.append(f"   ▶️ /resume\\_{gid[:8]}")
+            block.append("   📋 详情: 点击下方按钮\n")
+            lines.extend(block)
+            keyboard_rows.append(_build_task_row(gid, status))
 
         # 添加翻页按钮
         nav_buttons = []
@@ -233,9 +263,7 @@ class CallbackHandlersMixin:
         if nav_buttons:
             keyboard_rows.append(nav_buttons)
 
-        keyboard_rows.append(
-            [InlineKeyboardButton("🔙 返回列表", callback_data="list:menu")]
-        )
+        keyboard_rows.append(_BACK_TO_MENU_ROW)
 
         await query.edit_message_text(
             "\n".join(lines), reply_markup=InlineKeyboardMarkup(keyboard_rows)
@@ -274,14 +302,15 @@ class CallbackHandlersMixin:
         except RpcError:
             pass
 
-        # 尝试删除任务
-        try:
-            await rpc.remove(gid)
-        except RpcError:
+        # 尝试删除任务；已停止的任务不在队列中，remove/forceRemove 必然失败，直接清除记录
+        if task is None or task.status not in _STOPPED_STATUSES:
             try:
-                await rpc.force_remove(gid)
+                await rpc.remove(gid)
             except RpcError:
-                pass
+                try:
+                    await rpc.force_remove(gid)
+                except RpcError:
+                    pass
         try:
             await rpc.remove_download_result(gid)
         except RpcError:
@@ -298,132 +327,194 @@ class CallbackHandlersMixin:
 
         await query.edit_message_text(msg, parse_mode="Markdown")
 
-    def _stop_auto_refresh(self, key: str) -> None:
-        """停止自动刷新任务并等待清理"""
-        if key in self._auto_refresh_tasks:
-            task = self._auto_refresh_tasks.pop(key)
-            task.cancel()
-            # 注意：这里不等待任务完成，因为是同步方法
-            # 任务会在 finally 块中自行清理
+    def _stop_auto_refresh(self, key: str, keep_gid: str | None = None) -> None:
+        """取消消息的详情刷新订阅，任务无订阅者时停止其刷新"""
+        for gid in list(self._detail_subscribers):
+            if gid == keep_gid:
+                continue
+            subscribers = self._detail_subscribers[gid]
+            if subscribers.pop(key, None) is None or subscribers:
+                continue
+            del self._detail_subscribers[gid]
+            entry = self._auto_refresh_tasks.pop(gid, None)
+            if entry is not None:
+                # 不等待任务结束
+                entry[0].cancel()
 
     async def _handle_detail_callback(
         self, query, rpc: Aria2RpcClient, gid: str
     ) -> None:
-        """处理详情回调，启动自动刷新"""
-        chat_id = query.message.chat_id
-        msg_id = query.message.message_id
-        key = f"{chat_id}:{msg_id}"
+        """处理详情回调，订阅该任务的自动刷新"""
+        message = query.message
+        key = f"{message.chat_id}:{message.message_id}"
+
+        # 该消息之前若在显示其他任务，先取消订阅
+        self._stop_auto_refresh(key, keep_gid=gid)
+
+        # 同一任务的所有详情消息共用一个刷新任务，每轮只请求一次 RPC
+        subscribers = self._detail_subscribers.setdefault(gid, {})
+        entry = subscribers.get(key)
+        if entry is None:
+            subscribers[key] = [message, 0]
+        else:
+            entry[0] = message
+
+        # 刷新任务仍在运行时直接唤醒，立即刷新并重新计算刷新时长
+        running = self._auto_refresh_tasks.get(gid)
+        if running is not None and not running[0].done():
+            self._auto_refresh_tasks.move_to_end(gid)
+            running[1].set()
+            return
 
-        # 停止该消息之前的刷新任务
-        self._stop_auto_refresh(key)
+        wakeup = asyncio.Event()
+        task = asyncio.create_task(self._auto_refresh_detail(rpc, gid, wakeup))
+        task.add_done_callback(lambda t: self._on_auto_refresh_done(gid, t))
+        self._auto_refresh_tasks[gid] = (task, wakeup)
 
-        # 启动新的自动刷新任务
-        task = asyncio.create_task(
-            self._auto_refresh_detail(query.message, rpc, gid, key)
-        )
-        self._auto_refresh_tasks[key] = task
+        # 超出上限时停止最早的刷新任务
+        while len(self._auto_refresh_tasks) > MAX_AUTO_REFRESH_TASKS:
+            oldest_gid, oldest = self._auto_refresh_tasks.popitem(last=False)
+            self._detail_subscribers.pop(oldest_gid, None)
+            oldest[0].cancel()
+
+    def _on_auto_refresh_done(self, gid: str, task: asyncio.Task) -> None:
+        """刷新任务结束后清理，被新的刷新任务替换时不清理订阅"""
+        entry = self._auto_refresh_tasks.get(gid)
+        if entry is not None and entry[0] is task:
+            del self._auto_refresh_tasks[gid]
+            self._detail_subscribers.pop(gid, None)
 
     async def _auto_refresh_detail(
-        self, message, rpc: Aria2RpcClient, gid: str, key: str
+        self, rpc: Aria2RpcClient, gid: str, wakeup: asyncio.Event
     ) -> None:
-        """自动刷新详情页面"""
-        from .app_ref import get_bot_instance
-
-        try:
-            last_text = ""
-            for _ in range(60):  # 最多刷新 2 分钟
-                try:
-                    task = await rpc.get_status(gid)
-                except RpcError:
-                    break
+        """自动刷新详情页面，并将结果分发给订阅该任务的所有消息"""
+        # key -> [message, 上次渲染内容的签名]
+        subscribers = self._detail_subscribers.get(gid, {})
+        get_emoji = STATUS_EMOJI.get
+        build_keyboard = build_detail_keyboard_with_upload
+        prefix_name: str | None = None
+        prefix = ""
+        last_text: str | None = None
+        # 键盘只随状态变化，跨轮次缓存，状态不变时复用
+        keyboard_status: str | None = None
+        keyboard = None
+        stale = 0  # 内容连续未变化的轮数
+        # 最多刷新 2 分钟，被唤醒时重新计时
+        deadline = time.monotonic() + DETAIL_REFRESH_DURATION
+        while subscribers and (tick_start := time.monotonic()) < deadline:
+            try:
+                task = await rpc.get_status(gid)
+            except RpcError:
+                break
 
-                emoji = STATUS_EMOJI.get(task.status, "❓")
-                safe_name = (
-                    task.name.replace("_", "\\_").replace("*", "\\*").replace("`", "\\`")
-                )
-                text = (
+            # 文件名和 GID 基本不变，只在文件名变化时（如种子元数据解析完成）重建前缀
+            if task.name != prefix_name:
+                prefix_name = task.name
+                prefix = (
                     f"📋 *任务详情*\n"
-                    f"📄 文件: {safe_name}\n"
+                    f"📄 文件: {prefix_name.translate(_MD_ESCAPE_TABLE)}\n"
                     f"🆔 GID: `{task.gid}`\n"
-                    f"📊 状态: {emoji} {task.status}\n"
-                    f"📈 进度: {task.progress_bar} {task.progress:.1f}%\n"
-                    f"📦 大小: {task.size_str}\n"
-                    f"⬇️ 下载: {task.speed_str}\n"
-                    f"⬆️ 上传: {_format_size(task.upload_speed)}/s"
                 )
-                if task.error_message:
-                    text += f"\n❌ 错误: {task.error_message}"
-
-                # 检查是否显示上传按钮
-                show_onedrive = (
-                    task.status == "complete"
-                    and self._onedrive_config
-                    and self._onedrive_config.enabled
-                )
-                show_channel = (
+            emoji = get_emoji(task.status, "❓")
+            text = prefix + (
+                f"📊 状态: {emoji} {task.status}\n"
+                f"📈 进度: {task.progress_bar} {task.progress:.1f}%\n"
+                f"📦 大小: {task.size_str}\n"
+                f"⬇️ 下载: {task.speed_str}\n"
+                f"⬆️ 上传: {_format_size(task.upload_speed)}/s"
+            )
+            if task.error_message:
+                text += f"\n❌ 错误: {task.error_message}"
+
+            # 只有内容变化时才构建键盘并更新，状态参与签名以保证按钮同步
+            sig = hash((text, task.status))
+            for key, entry in list(subscribers.items()):
+                if entry[1] == sig:
+                    continue
+                if keyboard_status != task.status:
+                    # 检查是否显示上传按钮
+                    show_onedrive = (
+                        task.status == "complete"
+                        and self._onedrive_config
+                        and self._onedrive_config.enabled
+                    )
+                    show_channel = (
+                        task.status == "complete"
+                        and self._telegram_channel_config
+                        and self._telegram_channel_config.enabled
+                    )
+                    keyboard = build_keyboard(gid, task.status, show_onedrive, show_channel)
+                    keyboard_status = task.status
+                try:
+                    await entry[0].edit_text(
+                        text, parse_mode="Markdown", reply_markup=keyboard
+                    )
+                    entry[1] = sig
+                except Exception as e:
+                    # 内容与消息现有内容相同（如手动刷新后）不算失败，保留订阅继续刷新
+                    if isinstance(e, BadRequest) and "not modified" in str(e).lower():
+                        entry[1] = sig
+                        continue
+                    logger.warning("编辑消息失败 (GID=%s): %s", gid, e)
+                    subscribers.pop(key, None)
+
+            # 任务完成或出错时停止刷新
+            if task.status in _STOPPED_STATUSES:
+                if gid in self._download_monitors:
+                    # 任务同时在下载监控中：由监控统一发送通知并触发自动上传
+                    await self._finish_monitor(gid, task)
+                # 任务完成时检查是否需要自动上传（使用协调上传）
+                elif (
                     task.status == "complete"
-                    and self._telegram_channel_config
-                    and self._telegram_channel_config.enabled
-                )
-                keyboard = build_detail_keyboard_with_upload(
-                    gid, task.status, show_onedrive, show_channel
-                )
-
-                # 只有内容变化时才更新
-                if text != last_text:
-                    try:
-                        await message.edit_text(
-                            text, parse_mode="Markdown", reply_markup=keyboard
-                        )
-                        last_text = text
-                    except Exception as e:
-                        logger.warning(f"编辑消息失败 (GID={gid}): {e}")
-                        break
-
-                # 任务完成或出错时停止刷新
-                if task.status in ("complete", "error", "removed"):
-                    # 任务完成时检查是否需要自动上传（使用协调上传）
-                    if task.status == "complete" and gid not in self._auto_uploaded_gids:
-                        _bot_instance = get_bot_instance()
-                        need_onedrive = (
-                            self._onedrive_config
-                            and self._onedrive_config.enabled
-                            and self._onedrive_config.auto_upload
-                        )
-                        need_telegram = (
-                            self._telegram_channel_config
-                            and self._telegram_channel_config.enabled
-                            and self._telegram_channel_config.auto_upload
-                        )
-                        if need_onedrive or need_telegram:
-                            self._auto_uploaded_gids.add(gid)
-                            self._channel_uploaded_gids.add(gid)
-                            asyncio.create_task(
-                                self._coordinated_auto_upload(
-                                    message.chat_id, gid, task, _bot_instance
-                                )
+                    and subscribers
+                    and gid not in self._auto_uploaded_gids
+                ):
+                    _bot_instance = get_bot_instance()
+                    need_onedrive = (
+                        self._onedrive_config
+                        and self._onedrive_config.enabled
+                        and self._onedrive_config.auto_upload
+                    )
+                    need_telegram = (
+                        self._telegram_channel_config
+                        and self._telegram_channel_config.enabled
+                        and self._telegram_channel_config.auto_upload
+                    )
+                    if need_onedrive or need_telegram:
+                        # 去重由 _coordinated_auto_upload 统一处理，这里预先标记会导致上传被跳过
+                        chat_id = next(iter(subscribers.values()))[0].chat_id
+                        self._spawn_upload(
+                            self._coordinated_auto_upload(
+                                chat_id, gid, task, _bot_instance
                             )
-                    break
+                        )
+                break
 
-                await asyncio.sleep(2)
-        finally:
-            self._auto_refresh_tasks.pop(key, None)
+            # 内容无变化（如等待中或停滞的任务）时逐步拉长间隔：2s → 4s → 8s → 15s
+            if text == last_text:
+                stale += 1
+            else:
+                stale = 0
+                last_text = text
+            interval = min(DETAIL_REFRESH_MAX_INTERVAL, DETAIL_REFRESH_INTERVAL * 2 ** min(stale, 3))
+
+            # 扣除本轮查询和编辑消息的耗时，保持固定刷新节奏；
+            # 暂停/恢复/刷新等操作会设置事件，立即进入下一轮刷新
+            timeout = max(0.0, tick_start + interval - time.monotonic())
+            try:
+                await asyncio.wait_for(wakeup.wait(), timeout=timeout)
+            except TimeoutError:
+                continue
+            wakeup.clear()
+            stale = 0
+            deadline = time.monotonic() + DETAIL_REFRESH_DURATION
 
     async def _handle_stats_callback(self, query, rpc: Aria2RpcClient) -> None:
         """处理统计回调"""
         stat = await rpc.get_global_stat()
-        text = (
-            "📊 *全局统计*\n"
-            f"⬇️ 下载速度: {_format_size(int(stat.get('downloadSpeed', 0)))}/s\n"
-            f"⬆️ 上传速度: {_format_size(int(stat.get('uploadSpeed', 0)))}/s\n"
-            f"▶️ 活动任务: {stat.get('numActive', 0)}\n"
-            f"⏳ 等待任务: {stat.get('numWaiting', 0)}\n"
-            f"⏹️ 已停止: {stat.get('numStopped', 0)}"
-        )
-        keyboard = InlineKeyboardMarkup(
-            [[InlineKeyboardButton("🔙 返回列表", callback_data="list:menu")]]
+        await query.edit_message_text(
+            _format_global_stats(stat), parse_mode="Markdown", reply_markup=_BACK_TO_MENU_MARKUP
         )
-        await query.edit_message_text(text, parse_mode="Markdown", reply_markup=keyboard)
 
     # === 云存储回调处理 ===
 
@@ -694,7 +785,7 @@ class CallbackHandlersMixin:
 
         elif action == "set_channel":
             # 提示用户输入频道ID
-            user_id = update.effective_user.id if update.effective_user else None
+            user_id = _get_user_id(update)
             if user_id:
                 self._pending_channel_input = {user_id: True}
             await query.edit_message_text(
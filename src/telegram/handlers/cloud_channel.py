@@ -1,7 +1,6 @@
 """Telegram 频道存储功能处理。"""
 from __future__ import annotations
 
-import asyncio
 from pathlib import Path
 
 from telegram import Update
@@ -10,7 +9,7 @@ from telegram.ext import ContextTypes
 from src.utils.logger import get_logger
 from src.core import RpcError
 
-from .base import _get_user_info
+from .base import _get_user_id, _get_user_info
 
 logger = get_logger("handlers.cloud_channel")
 
@@ -20,32 +19,33 @@ class TelegramChannelHandlersMixin:
 
     async def _trigger_channel_auto_upload(self, chat_id: int, gid: str, bot) -> None:
         """触发频道自动上传"""
-        logger.info(f"触发频道自动上传 GID={gid}")
+        logger.info("触发频道自动上传 GID=%s", gid)
 
         client = self._get_telegram_channel_client(bot)
         if not client:
-            logger.warning(f"频道上传跳过：频道未配置 GID={gid}")
+            logger.warning("频道上传跳过：频道未配置 GID=%s", gid)
             return
 
         rpc = self._get_rpc_client()
         try:
             task = await rpc.get_status(gid)
         except RpcError as e:
-            logger.error(f"频道上传失败：获取任务信息失败 GID={gid}: {e}")
+            logger.error("频道上传失败：获取任务信息失败 GID=%s: %s", gid, e)
             return
 
         if task.status != "complete":
             return
 
         local_path = Path(task.dir) / task.name
-        if not local_path.exists():
+        file_size = await self._get_file_size(local_path)
+        if file_size is None:
             logger.error(
-                f"频道上传失败：本地文件不存在 GID={gid}, dir={task.dir}, name={task.name}, path={local_path}"
+                "频道上传失败：本地文件不存在 GID=%s, dir=%s, name=%s, path=%s",
+                gid, task.dir, task.name, local_path,
             )
             return
 
         # 检查文件大小
-        file_size = local_path.stat().st_size
         if file_size > client.get_max_size():
             limit_mb = client.get_max_size_mb()
             await bot.send_message(
@@ -53,7 +53,7 @@ class TelegramChannelHandlersMixin:
             )
             return
 
-        asyncio.create_task(
+        self._spawn_upload(
             self._do_channel_upload(client, local_path, task.name, chat_id, gid, bot)
         )
 
@@ -78,7 +78,7 @@ class TelegramChannelHandlersMixin:
         try:
             msg = await bot.send_message(chat_id=chat_id, text=f"📢 正在发送到频道: {task_name}")
         except Exception as e:
-            logger.error(f"频道上传失败：发送消息失败 GID={gid}: {e}")
+            logger.error("频道上传失败：发送消息失败 GID=%s: %s", gid, e)
             return False
 
         try:
@@ -94,14 +94,14 @@ class TelegramChannelHandlersMixin:
                     _, delete_msg = await self._delete_local_file(local_path, gid)
                     result_text += f"\n{delete_msg}"
                 await msg.edit_text(result_text)
-                logger.info(f"频道上传成功 GID={gid}")
+                logger.info("频道上传成功 GID=%s", gid)
                 return True
             else:
                 await msg.edit_text(f"❌ 发送到频道失败: {task_name}\n原因: {result}")
-                logger.error(f"频道上传失败 GID={gid}: {result}")
+                logger.error("频道上传失败 GID=%s: %s", gid, result)
                 return False
         except Exception as e:
-            logger.error(f"频道上传异常 GID={gid}: {e}")
+            logger.error("频道上传异常 GID=%s: %s", gid, e)
             try:
                 await msg.edit_text(f"❌ 发送到频道失败: {task_name}\n错误: {e}")
             except Exception:
@@ -112,7 +112,7 @@ class TelegramChannelHandlersMixin:
         self, update: Update, context: ContextTypes.DEFAULT_TYPE
     ) -> bool:
         """处理频道ID输入，返回 True 表示已处理"""
-        user_id = update.effective_user.id if update.effective_user else None
+        user_id = _get_user_id(update)
         if not user_id or user_id not in self._pending_channel_input:
             return False
 
@@ -125,9 +125,7 @@ class TelegramChannelHandlersMixin:
             return True
 
         # 验证格式
-        if not (
-            text.startswith("@") or text.startswith("-100") or text.lstrip("-").isdigit()
-        ):
+        if not (text.startswith(("@", "-100")) or text.lstrip("-").isdigit()):
             await self._reply(
                 update,
                 context,
@@ -161,8 +159,6 @@ class TelegramChannelHandlersMixin:
         self, query, update: Update, context: ContextTypes.DEFAULT_TYPE, gid: str
     ) -> None:
         """手动上传到频道"""
-        import shutil
-
         client = self._get_telegram_channel_client(context.bot)
         if not client:
             await query.edit_message_text("❌ 频道存储未配置")
@@ -180,12 +176,12 @@ class TelegramChannelHandlersMixin:
             return
 
         local_path = Path(task.dir) / task.name
-        if not local_path.exists():
+        file_size = await self._get_file_size(local_path)
+        if file_size is None:
             await query.edit_message_text("❌ 本地文件不存在")
             return
 
         # 检查文件大小
-        file_size = local_path.stat().st_size
         if file_size > client.get_max_size():
             limit_mb = client.get_max_size_mb()
             await query.edit_message_text(f"❌ 文件超过 {limit_mb}MB 限制")
@@ -199,14 +195,8 @@ class TelegramChannelHandlersMixin:
                 self._telegram_channel_config
                 and self._telegram_channel_config.delete_after_upload
             ):
-                try:
-                    if local_path.is_dir():
-                        shutil.rmtree(local_path)
-                    else:
-                        local_path.unlink()
-                    result_text += "\n🗑️ 本地文件已删除"
-                except Exception as e:
-                    result_text += f"\n⚠️ 删除本地文件失败: {e}"
+                _, delete_msg = await self._delete_local_file(local_path, gid)
+                result_text += f"\n{delete_msg}"
             await query.edit_message_text(result_text)
         else:
             await query.edit_message_text(f"❌ 发送失败: {result}")
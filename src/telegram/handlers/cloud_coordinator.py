@@ -5,7 +5,8 @@ import asyncio
 from pathlib import Path
 
 from src.utils.logger import get_logger
-from src.core import DOWNLOAD_DIR
+
+from .app_ref import get_bot_instance
 
 logger = get_logger("handlers.cloud_coordinator")
 
@@ -20,8 +21,8 @@ class CloudCoordinatorMixin:
         并行执行上传，全部成功后才删除本地文件。
         """
         local_path = Path(task.dir) / task.name
-        if not local_path.exists():
-            logger.error(f"协调上传失败：本地文件不存在 GID={gid}")
+        if await self._get_file_size(local_path) is None:
+            logger.error("协调上传失败：本地文件不存在 GID=%s", gid)
             return
 
         # 检测哪些云存储需要上传
@@ -42,34 +43,35 @@ class CloudCoordinatorMixin:
         need_coordinated_delete = onedrive_delete and telegram_delete
 
         if need_coordinated_delete:
+            # 以 OneDrive 的上传记录作为协调上传的去重标记，避免同一任务被重复触发
+            claimed = self._auto_uploaded_gids.add_new(gid)
+            self._channel_uploaded_gids.add(gid)
+            if not claimed:
+                return
             # 并行执行，跳过各自的删除，最后统一删除
-            logger.info(f"启动协调并行上传 GID={gid}")
+            logger.info("启动协调并行上传 GID=%s", gid)
             await self._parallel_upload_with_coordinated_delete(
                 chat_id, gid, local_path, task.name, bot
             )
         else:
             # 独立执行（保持现有逻辑）
-            if need_onedrive and gid not in self._auto_uploaded_gids:
-                self._auto_uploaded_gids.add(gid)
-                asyncio.create_task(self._trigger_auto_upload(chat_id, gid))
+            if need_onedrive and self._auto_uploaded_gids.add_new(gid):
+                self._spawn_upload(self._trigger_auto_upload(chat_id, gid))
 
-            if need_telegram and gid not in self._channel_uploaded_gids:
-                self._channel_uploaded_gids.add(gid)
-                asyncio.create_task(self._trigger_channel_auto_upload(chat_id, gid, bot))
+            if need_telegram and self._channel_uploaded_gids.add_new(gid):
+                self._spawn_upload(self._trigger_channel_auto_upload(chat_id, gid, bot))
 
     async def _parallel_upload_with_coordinated_delete(
         self, chat_id: int, gid: str, local_path, task_name: str, bot
     ) -> None:
         """并行上传到多个云存储，全部成功后才删除文件"""
-        from .app_ref import get_bot_instance
-
         # 准备 OneDrive 上传参数
         onedrive_client = self._get_onedrive_client()
         onedrive_authenticated = onedrive_client and await onedrive_client.is_authenticated()
 
         # 计算 OneDrive 远程路径
         try:
-            download_dir = DOWNLOAD_DIR.resolve()
+            download_dir = self._get_download_dir()
             relative_path = local_path.resolve().relative_to(download_dir)
             remote_path = f"{self._onedrive_config.remote_path}/{relative_path.parent}"
         except ValueError:
@@ -81,8 +83,8 @@ class CloudCoordinatorMixin:
         # 检查文件大小是否超过 Telegram 限制
         telegram_size_ok = True
         if telegram_client:
-            file_size = local_path.stat().st_size
-            if file_size > telegram_client.get_max_size():
+            file_size = await self._get_file_size(local_path)
+            if file_size is not None and file_size > telegram_client.get_max_size():
                 telegram_size_ok = False
                 limit_mb = telegram_client.get_max_size_mb()
                 await bot.send_message(
@@ -117,7 +119,7 @@ class CloudCoordinatorMixin:
             task_names.append("telegram")
 
         if not tasks:
-            logger.warning(f"协调上传跳过：没有可用的上传目标 GID={gid}")
+            logger.warning("协调上传跳过：没有可用的上传目标 GID=%s", gid)
             return
 
         # 并行执行上传
@@ -127,7 +129,7 @@ class CloudCoordinatorMixin:
         all_success = True
         for i, result in enumerate(results):
             if isinstance(result, Exception):
-                logger.error(f"协调上传异常 ({task_names[i]}) GID={gid}: {result}")
+                logger.error("协调上传异常 (%s) GID=%s: %s", task_names[i], gid, result)
                 all_success = False
             elif result is not True:
                 all_success = False
@@ -3,26 +3,36 @@ from __future__ import annotations
 
 import asyncio
 from pathlib import Path
+from typing import Callable
 
 from telegram import Update
+from telegram.error import RetryAfter
 from telegram.ext import ContextTypes
 
 from src.utils.logger import get_logger
-from src.core import RpcError, DOWNLOAD_DIR
+from src.core import RpcError
 from src.cloud.base import UploadProgress, UploadStatus
 from src.telegram.keyboards import build_cloud_menu_keyboard
 
-from .base import _get_user_info
+from .app_ref import get_bot_instance
+from .base import _LazyUser, _get_user_info
 
 logger = get_logger("handlers.cloud_onedrive")
 
+# OneDrive 认证回调 URL 前缀
+_MS_AUTH_PREFIX = "https://login.microsoftonline.com"
+
+# 上传进度消息的最小更新间隔（秒）和最小进度变化（百分比）
+UPLOAD_PROGRESS_MIN_INTERVAL = 2.0
+UPLOAD_PROGRESS_MIN_STEP = 1.0
+
 
 class OneDriveHandlersMixin:
     """OneDrive 云存储功能 Mixin"""
 
     async def cloud_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         """云存储管理菜单"""
-        logger.info(f"收到 /cloud 命令 - {_get_user_info(update)}")
+        logger.info("收到 /cloud 命令 - %s", _LazyUser(update))
         if not self._onedrive_config or not self._onedrive_config.enabled:
             await self._reply(
                 update, context, "❌ 云存储功能未启用，请在配置中设置 ONEDRIVE_ENABLED=true"
@@ -35,7 +45,7 @@ class OneDriveHandlersMixin:
 
     async def cloud_auth(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         """开始 OneDrive 认证"""
-        logger.info(f"收到云存储认证请求 - {_get_user_info(update)}")
+        logger.info("收到云存储认证请求 - %s", _LazyUser(update))
         client = self._get_onedrive_client()
         if not client:
             await self._reply(update, context, "❌ OneDrive 未配置")
@@ -64,8 +74,11 @@ class OneDriveHandlersMixin:
         self, update: Update, context: ContextTypes.DEFAULT_TYPE
     ) -> None:
         """处理用户发送的认证回调 URL"""
+        # 绝大多数时候没有进行中的认证，直接返回
+        if not self._pending_auth:
+            return
         text = update.message.text
-        if not text or not text.startswith("https://login.microsoftonline.com"):
+        if not text or not text.startswith(_MS_AUTH_PREFIX):
             return
 
         user_id = update.effective_user.id
@@ -84,13 +97,13 @@ class OneDriveHandlersMixin:
         if await client.authenticate_with_code(text, flow=flow):
             del self._pending_auth[user_id]
             reply_message = await self._reply(update, context, "✅ OneDrive 认证成功！")
-            logger.info(f"OneDrive 认证成功 - {_get_user_info(update)}")
+            logger.info("OneDrive 认证成功 - %s", _LazyUser(update))
         else:
             # 认证失败时清理认证信息
             del self._pending_auth[user_id]
             await client.logout()  # 删除可能存在的旧 token
             reply_message = await self._reply(update, context, "❌ 认证失败，请重试")
-            logger.error(f"OneDrive 认证失败 - {_get_user_info(update)}")
+            logger.error("OneDrive 认证失败 - %s", _LazyUser(update))
 
         # 延迟 5 秒后删除敏感消息（包括认证指引消息）
         messages_to_delete = [msg for msg in [user_message, reply_message, auth_message] if msg]
@@ -99,7 +112,7 @@ class OneDriveHandlersMixin:
 
     async def cloud_logout(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         """登出云存储"""
-        logger.info(f"收到云存储登出请求 - {_get_user_info(update)}")
+        logger.info("收到云存储登出请求 - %s", _LazyUser(update))
         client = self._get_onedrive_client()
         if not client:
             await self._reply(update, context, "❌ OneDrive 未配置")
@@ -112,7 +125,7 @@ class OneDriveHandlersMixin:
 
     async def cloud_status(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         """查看云存储状态"""
-        logger.info(f"收到云存储状态查询 - {_get_user_info(update)}")
+        logger.info("收到云存储状态查询 - %s", _LazyUser(update))
         client = self._get_onedrive_client()
         if not client:
             await self._reply(update, context, "❌ OneDrive 未配置")
@@ -138,7 +151,7 @@ class OneDriveHandlersMixin:
         self, update: Update, context: ContextTypes.DEFAULT_TYPE, gid: str
     ) -> None:
         """上传文件到云存储（启动后台任务，不阻塞其他命令）"""
-        logger.info(f"收到上传请求 GID={gid} - {_get_user_info(update)}")
+        logger.info("收到上传请求 GID=%s - %s", gid, _LazyUser(update))
         client = self._get_onedrive_client()
         if not client or not await client.is_authenticated():
             await self._reply(update, context, "❌ OneDrive 未认证，请先使用 /cloud 进行认证")
@@ -156,13 +169,13 @@ class OneDriveHandlersMixin:
             return
 
         local_path = Path(task.dir) / task.name
-        if not local_path.exists():
+        if await self._get_file_size(local_path) is None:
             await self._reply(update, context, "❌ 本地文件不存在")
             return
 
         # 计算远程路径（保持目录结构）
         try:
-            download_dir = DOWNLOAD_DIR.resolve()
+            download_dir = self._get_download_dir()
             relative_path = local_path.resolve().relative_to(download_dir)
             remote_path = f"{self._onedrive_config.remote_path}/{relative_path.parent}"
         except ValueError:
@@ -171,64 +184,86 @@ class OneDriveHandlersMixin:
         msg = await self._reply(update, context, f"☁️ 正在上传: {task.name}\n⏳ 请稍候...")
 
         # 启动后台上传任务，不阻塞其他命令
-        asyncio.create_task(
+        self._spawn_upload(
             self._do_upload_to_cloud(
                 client, local_path, remote_path, task.name, msg, gid, _get_user_info(update)
             )
         )
 
-    async def _do_upload_to_cloud(
-        self, client, local_path, remote_path: str, task_name: str, msg, gid: str, user_info: str
-    ) -> None:
-        """后台执行上传任务"""
-        import shutil
+    def _start_upload_progress(
+        self, msg, title: str
+    ) -> tuple[Callable[[UploadProgress], None], asyncio.Task]:
+        """启动上传进度更新，返回 (进度回调, 消费任务)
 
-        loop = asyncio.get_running_loop()
+        回调在上传线程中调用，只把最新进度写入单元素槽位，不唤醒事件循环；
+        由单个消费任务定时读取槽位并节流编辑进度消息，避免频繁编辑触发 Telegram 限流。
+        上传结束后调用方需取消消费任务。
+        """
+        latest: list[UploadProgress | None] = [None]
 
-        # 进度回调函数
-        async def update_progress(progress: UploadProgress):
-            """更新上传进度消息"""
+        def sync_progress_callback(progress: UploadProgress):
+            """同步回调，仅记录最新进度（列表元素赋值在 CPython 中是原子的）"""
             if progress.status == UploadStatus.UPLOADING and progress.total_size > 0:
+                latest[0] = progress
+
+        async def drain() -> None:
+            """定时读取最新进度并更新消息"""
+            last_percent = -UPLOAD_PROGRESS_MIN_STEP
+            last_text = ""
+            while True:
+                await asyncio.sleep(UPLOAD_PROGRESS_MIN_INTERVAL)
+                progress = latest[0]
+                if progress is None:
+                    continue
                 percent = progress.progress
+                if percent - last_percent < UPLOAD_PROGRESS_MIN_STEP:
+                    continue
+                last_percent = percent
                 uploaded_mb = progress.uploaded_size / (1024 * 1024)
                 total_mb = progress.total_size / (1024 * 1024)
-                progress_text = (
-                    f"☁️ 正在上传: {task_name}\n"
-                    f"📤 {percent:.1f}% ({uploaded_mb:.1f}MB / {total_mb:.1f}MB)"
-                )
+                text = f"{title}\n📤 {percent:.1f}% ({uploaded_mb:.1f}MB / {total_mb:.1f}MB)"
+                # 渲染结果与上次相同时不发请求，Telegram 也会拒绝内容未变化的编辑
+                if text == last_text:
+                    continue
                 try:
-                    await msg.edit_text(progress_text)
+                    await msg.edit_text(text)
+                    last_text = text
+                except RetryAfter as e:
+                    # 被限流时等待，期间上传线程继续覆盖槽位中的进度
+                    await asyncio.sleep(e.retry_after)
                 except Exception:
                     pass  # 忽略消息更新失败（如内容未变化）
 
-        def sync_progress_callback(progress: UploadProgress):
-            """同步回调，将异步更新调度到事件循环"""
-            if progress.status == UploadStatus.UPLOADING:
-                asyncio.run_coroutine_threadsafe(update_progress(progress), loop)
+        return sync_progress_callback, asyncio.create_task(drain())
+
+    async def _do_upload_to_cloud(
+        self, client, local_path, remote_path: str, task_name: str, msg, gid: str, user_info: str
+    ) -> None:
+        """后台执行上传任务"""
+        sync_progress_callback, progress_task = self._start_upload_progress(msg, f"☁️ 正在上传: {task_name}")
 
         try:
-            success = await client.upload_file(
-                local_path, remote_path, progress_callback=sync_progress_callback
-            )
+            try:
+                # 限制并发上传数，避免大量任务同时完成时占满带宽并触发限流
+                async with self._upload_sem:
+                    success = await client.upload_file(
+                        local_path, remote_path, progress_callback=sync_progress_callback
+                    )
+            finally:
+                progress_task.cancel()
 
             if success:
                 result_text = f"✅ 上传成功: {task_name}"
                 if self._onedrive_config and self._onedrive_config.delete_after_upload:
-                    try:
-                        if local_path.is_dir():
-                            shutil.rmtree(local_path)
-                        else:
-                            local_path.unlink()
-                        result_text += "\n🗑️ 本地文件已删除"
-                    except Exception as e:
-                        result_text += f"\n⚠️ 删除本地文件失败: {e}"
+                    _, delete_msg = await self._delete_local_file(local_path, gid)
+                    result_text += f"\n{delete_msg}"
                 await msg.edit_text(result_text)
-                logger.info(f"上传成功 GID={gid} - {user_info}")
+                logger.info("上传成功 GID=%s - %s", gid, user_info)
             else:
                 await msg.edit_text(f"❌ 上传失败: {task_name}")
-                logger.error(f"上传失败 GID={gid} - {user_info}")
+                logger.error("上传失败 GID=%s - %s", gid, user_info)
         except Exception as e:
-            logger.error(f"上传异常 GID={gid}: {e} - {user_info}")
+            logger.error("上传异常 GID=%s: %s - %s", gid, e, user_info)
             try:
                 await msg.edit_text(f"❌ 上传失败: {task_name}\n错误: {e}")
             except Exception:
@@ -236,39 +271,39 @@ class OneDriveHandlersMixin:
 
     async def _trigger_auto_upload(self, chat_id: int, gid: str) -> None:
         """自动上传触发（下载完成后自动调用）"""
-        logger.info(f"触发自动上传 GID={gid}")
+        logger.info("触发自动上传 GID=%s", gid)
 
         client = self._get_onedrive_client()
         if not client or not await client.is_authenticated():
-            logger.warning(f"自动上传跳过：OneDrive 未认证 GID={gid}")
+            logger.warning("自动上传跳过：OneDrive 未认证 GID=%s", gid)
             return
 
         rpc = self._get_rpc_client()
         try:
             task = await rpc.get_status(gid)
         except RpcError as e:
-            logger.error(f"自动上传失败：获取任务信息失败 GID={gid}: {e}")
+            logger.error("自动上传失败：获取任务信息失败 GID=%s: %s", gid, e)
             return
 
         if task.status != "complete":
-            logger.warning(f"自动上传跳过：任务未完成 GID={gid}")
+            logger.warning("自动上传跳过：任务未完成 GID=%s", gid)
             return
 
         local_path = Path(task.dir) / task.name
-        if not local_path.exists():
-            logger.error(f"自动上传失败：本地文件不存在 GID={gid}")
+        if await self._get_file_size(local_path) is None:
+            logger.error("自动上传失败：本地文件不存在 GID=%s", gid)
             return
 
         # 计算远程路径
         try:
-            download_dir = DOWNLOAD_DIR.resolve()
+            download_dir = self._get_download_dir()
             relative_path = local_path.resolve().relative_to(download_dir)
             remote_path = f"{self._onedrive_config.remote_path}/{relative_path.parent}"
         except ValueError:
             remote_path = self._onedrive_config.remote_path
 
         # 启动后台上传任务
-        asyncio.create_task(
+        self._spawn_upload(
             self._do_auto_upload(client, local_path, remote_path, task.name, chat_id, gid)
         )
 
@@ -290,11 +325,9 @@ class OneDriveHandlersMixin:
         Returns:
             上传是否成功
         """
-        from .app_ref import get_bot_instance
-
         _bot_instance = get_bot_instance()
         if _bot_instance is None:
-            logger.error(f"自动上传失败：无法获取 bot 实例 GID={gid}")
+            logger.error("自动上传失败：无法获取 bot 实例 GID=%s", gid)
             return False
 
         # 发送上传开始通知
@@ -303,34 +336,20 @@ class OneDriveHandlersMixin:
                 chat_id=chat_id, text=f"☁️ 自动上传开始: {task_name}\n⏳ 请稍候..."
             )
         except Exception as e:
-            logger.error(f"自动上传失败：发送消息失败 GID={gid}: {e}")
+            logger.error("自动上传失败：发送消息失败 GID=%s: %s", gid, e)
             return False
 
-        loop = asyncio.get_running_loop()
-
-        # 进度回调函数
-        async def update_progress(progress):
-            if progress.status == UploadStatus.UPLOADING and progress.total_size > 0:
-                percent = progress.progress
-                uploaded_mb = progress.uploaded_size / (1024 * 1024)
-                total_mb = progress.total_size / (1024 * 1024)
-                progress_text = (
-                    f"☁️ 自动上传: {task_name}\n"
-                    f"📤 {percent:.1f}% ({uploaded_mb:.1f}MB / {total_mb:.1f}MB)"
-                )
-                try:
-                    await msg.edit_text(progress_text)
-                except Exception:
-                    pass
-
-        def sync_progress_callback(progress):
-            if progress.status == UploadStatus.UPLOADING:
-                asyncio.run_coroutine_threadsafe(update_progress(progress), loop)
+        sync_progress_callback, progress_task = self._start_upload_progress(msg, f"☁️ 自动上传: {task_name}")
 
         try:
-            success = await client.upload_file(
-                local_path, remote_path, progress_callback=sync_progress_callback
-            )
+            try:
+                # 限制并发上传数，避免大量任务同时完成时占满带宽并触发限流
+                async with self._upload_sem:
+                    success = await client.upload_file(
+                        local_path, remote_path, progress_callback=sync_progress_callback
+                    )
+            finally:
+                progress_task.cancel()
 
             if success:
                 result_text = f"✅ 自动上传成功: {task_name}"
@@ -343,14 +362,14 @@ class OneDriveHandlersMixin:
                     _, delete_msg = await self._delete_local_file(local_path, gid)
                     result_text += f"\n{delete_msg}"
                 await msg.edit_text(result_text)
-                logger.info(f"自动上传成功 GID={gid}")
+                logger.info("自动上传成功 GID=%s", gid)
                 return True
             else:
                 await msg.edit_text(f"❌ 自动上传失败: {task_name}")
-                logger.error(f"自动上传失败 GID={gid}")
+                logger.error("自动上传失败 GID=%s", gid)
                 return False
         except Exception as e:
-            logger.error(f"自动上传异常 GID={gid}: {e}")
+            logger.error("自动上传异常 GID=%s: %s", gid, e)
             try:
                 await msg.edit_text(f"❌ 自动上传失败: {task_name}\n错误: {e}")
             except Exception:
@@ -3,32 +3,44 @@ from __future__ import annotations
 
 import asyncio
 import re
+import time
 
 from telegram import Update
 from telegram.ext import ContextTypes
 
 from src.utils.logger import get_logger
 from src.core import RpcError
-from src.aria2.rpc import DownloadTask, _format_size
+from src.aria2.rpc import DownloadTask
 from src.telegram.keyboards import (
     build_list_type_keyboard,
     build_after_add_keyboard,
 )
 
-from .base import _get_user_info, _validate_download_url
+from .app_ref import get_bot_instance
+from .base import (
+    _MD_ESCAPE_TABLE,
+    _format_global_stats,
+    _LazyUser,
+    _validate_download_url,
+)
 
 # 匹配 HTTP/HTTPS 链接和磁力链接的正则表达式
 URL_PATTERN = re.compile(r'(https?://[^\s<>"]+|magnet:\?[^\s<>"]+)')
 
 logger = get_logger("handlers.download")
 
+# 下载监控的轮询间隔和单个任务的最长监控时间（秒）
+MONITOR_POLL_INTERVAL = 5.0
+MONITOR_MAX_DURATION = 24 * 60 * 60
+
 
 class DownloadHandlersMixin:
     """下载管理命令 Mixin"""
 
     async def add_download(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         """/add <url> - 添加下载任务"""
-        logger.info(f"收到 /add 命令 - {_get_user_info(update)}")
+        user = _LazyUser(update)
+        logger.info("收到 /add 命令 - %s", user)
         if not context.args:
             await self._reply(update, context, "用法: /add <URL>\n支持 HTTP/HTTPS/磁力链接")
             return
@@ -46,21 +58,22 @@ class DownloadHandlersMixin:
             gid = await rpc.add_uri(url)
             task = await rpc.get_status(gid)
             # 转义文件名中的 Markdown 特殊字符
-            safe_name = task.name.replace("_", "\\_").replace("*", "\\*").replace("`", "\\`")
+            safe_name = task.name.translate(_MD_ESCAPE_TABLE)
             text = f"✅ 任务已添加\n📄 {safe_name}\n🆔 GID: `{gid}`"
             keyboard = build_after_add_keyboard(gid)
             await self._reply(update, context, text, parse_mode="Markdown", reply_markup=keyboard)
-            logger.info(f"/add 命令执行成功, GID={gid} - {_get_user_info(update)}")
+            logger.info("/add 命令执行成功, GID=%s - %s", gid, user)
             # 启动下载监控，完成或失败时通知用户
             chat_id = update.effective_chat.id
             asyncio.create_task(self._start_download_monitor(gid, chat_id))
         except RpcError as e:
-            logger.error(f"/add 命令执行失败: {e} - {_get_user_info(update)}")
+            logger.error("/add 命令执行失败: %s - %s", e, user)
             await self._reply(update, context, f"❌ 添加失败: {e}")
 
     async def handle_torrent(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         """处理用户发送的种子文件"""
-        logger.info(f"收到种子文件 - {_get_user_info(update)}")
+        user = _LazyUser(update)
+        logger.info("收到种子文件 - %s", user)
         document = update.message.document
         if not document or not document.file_name.endswith(".torrent"):
             return
@@ -72,16 +85,16 @@ class DownloadHandlersMixin:
             gid = await rpc.add_torrent(bytes(torrent_data))
             task = await rpc.get_status(gid)
             # 转义文件名中的 Markdown 特殊字符
-            safe_name = task.name.replace("_", "\\_").replace("*", "\\*").replace("`", "\\`")
+            safe_name = task.name.translate(_MD_ESCAPE_TABLE)
             text = f"✅ 种子任务已添加\n📄 {safe_name}\n🆔 GID: `{gid}`"
             keyboard = build_after_add_keyboard(gid)
             await self._reply(update, context, text, parse_mode="Markdown", reply_markup=keyboard)
-            logger.info(f"种子任务添加成功, GID={gid} - {_get_user_info(update)}")
+            logger.info("种子任务添加成功, GID=%s - %s", gid, user)
             # 启动下载监控，完成或失败时通知用户
             chat_id = update.effective_chat.id
             asyncio.create_task(self._start_download_monitor(gid, chat_id))
         except RpcError as e:
-            logger.error(f"种子任务添加失败: {e} - {_get_user_info(update)}")
+            logger.error("种子任务添加失败: %s - %s", e, user)
             await self._reply(update, context, f"❌ 添加种子失败: {e}")
 
     async def handle_url_message(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
@@ -91,7 +104,8 @@ class DownloadHandlersMixin:
         if not urls:
             return
 
-        logger.info(f"收到链接消息，提取到 {len(urls)} 个链接 - {_get_user_info(update)}")
+        user = _LazyUser(update)
+        logger.info("收到链接消息，提取到 %d 个链接 - %s", len(urls), user)
         chat_id = update.effective_chat.id
         rpc = self._get_rpc_client()
 
@@ -105,22 +119,23 @@ class DownloadHandlersMixin:
             try:
                 gid = await rpc.add_uri(url)
                 task = await rpc.get_status(gid)
-                safe_name = task.name.replace("_", "\\_").replace("*", "\\*").replace("`", "\\`")
+                safe_name = task.name.translate(_MD_ESCAPE_TABLE)
                 reply_text = f"✅ 任务已添加\n📄 {safe_name}\n🆔 GID: `{gid}`"
                 keyboard = build_after_add_keyboard(gid)
                 await self._reply(update, context, reply_text, parse_mode="Markdown", reply_markup=keyboard)
-                logger.info(f"链接任务添加成功, GID={gid} - {_get_user_info(update)}")
+                logger.info("链接任务添加成功, GID=%s - %s", gid, user)
                 asyncio.create_task(self._start_download_monitor(gid, chat_id))
             except RpcError as e:
-                logger.error(f"链接任务添加失败: {e} - {_get_user_info(update)}")
+                logger.error("链接任务添加失败: %s - %s", e, user)
                 await self._reply(update, context, f"❌ 添加失败: {e}")
 
     async def list_downloads(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         """/list - 查看下载列表"""
-        logger.info(f"收到 /list 命令 - {_get_user_info(update)}")
+        user = _LazyUser(update)
+        logger.info("收到 /list 命令 - %s", user)
         try:
             rpc = self._get_rpc_client()
-            stat = await rpc.get_global_stat()
+            stat = await self._fetch_list_overview(rpc, update.effective_chat.id)
             active_count = int(stat.get("numActive", 0))
             waiting_count = int(stat.get("numWaiting", 0))
             stopped_count = int(stat.get("numStopped", 0))
@@ -128,26 +143,19 @@ class DownloadHandlersMixin:
             keyboard = build_list_type_keyboard(active_count, waiting_count, stopped_count)
             await self._reply(update, context, "📥 选择查看类型：", reply_markup=keyboard)
         except RpcError as e:
-            logger.error(f"/list 命令执行失败: {e} - {_get_user_info(update)}")
+            logger.error("/list 命令执行失败: %s - %s", e, user)
             await self._reply(update, context, f"❌ 获取列表失败: {e}")
 
     async def global_stats(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         """/stats - 全局下载统计"""
-        logger.info(f"收到 /stats 命令 - {_get_user_info(update)}")
+        user = _LazyUser(update)
+        logger.info("收到 /stats 命令 - %s", user)
         try:
             rpc = self._get_rpc_client()
             stat = await rpc.get_global_stat()
-            text = (
-                "📊 *全局统计*\n"
-                f"⬇️ 下载速度: {_format_size(int(stat.get('downloadSpeed', 0)))}/s\n"
-                f"⬆️ 上传速度: {_format_size(int(stat.get('uploadSpeed', 0)))}/s\n"
-                f"▶️ 活动任务: {stat.get('numActive', 0)}\n"
-                f"⏳ 等待任务: {stat.get('numWaiting', 0)}\n"
-                f"⏹️ 已停止: {stat.get('numStopped', 0)}"
-            )
-            await self._reply(update, context, text, parse_mode="Markdown")
+            await self._reply(update, context, _format_global_stats(stat), parse_mode="Markdown")
         except RpcError as e:
-            logger.error(f"/stats 命令执行失败: {e} - {_get_user_info(update)}")
+            logger.error("/stats 命令执行失败: %s - %s", e, user)
             await self._reply(update, context, f"❌ 获取统计失败: {e}")
 
     # === 下载任务监控和通知 ===
@@ -156,64 +164,79 @@ class DownloadHandlersMixin:
         """启动下载任务监控"""
         if gid in self._download_monitors:
             return
-        task = asyncio.create_task(self._monitor_download(gid, chat_id))
-        self._download_monitors[gid] = task
+        self._download_monitors[gid] = (chat_id, time.monotonic() + MONITOR_MAX_DURATION)
+        if self._monitor_task is None or self._monitor_task.done():
+            self._monitor_task = asyncio.create_task(self._monitor_downloads())
 
-    async def _monitor_download(self, gid: str, chat_id: int) -> None:
-        """监控下载任务直到完成或失败"""
-        from .app_ref import get_bot_instance
+    async def _monitor_downloads(self) -> None:
+        """批量监控所有下载任务，完成或失败时通知用户
 
-        try:
-            rpc = self._get_rpc_client()
-            for _ in range(17280):  # 最长 24 小时 (5秒 * 17280)
+        所有被监控的任务共用一个轮询循环，每轮通过 system.multicall 一次请求查询全部状态，
+        RPC 请求数不再随监控任务数量增长。
+        """
+        rpc = self._get_rpc_client()
+        monitors = self._download_monitors
+        refreshing = self._auto_refresh_tasks
+        while monitors:
+            # 正在自动刷新详情的任务由刷新循环负责检测结束，这里不重复查询
+            gids = [gid for gid in monitors if gid not in refreshing]
+            tasks: dict[str, DownloadTask | None] = {}
+            if gids:
                 try:
-                    task = await rpc.get_status(gid)
-                except RpcError:
-                    break  # 任务可能已被删除
-
-                if task.status == "complete":
-                    if gid not in self._notified_gids:
-                        self._notified_gids.add(gid)
-                        await self._send_completion_notification(chat_id, task)
-                    break
-                elif task.status == "error":
-                    if gid not in self._notified_gids:
-                        self._notified_gids.add(gid)
-                        await self._send_error_notification(chat_id, task)
-                    break
-                elif task.status == "removed":
-                    break
-
-                await asyncio.sleep(5)
-        finally:
-            self._download_monitors.pop(gid, None)
+                    tasks = await rpc.get_statuses(gids)
+                except RpcError as e:
+                    logger.warning("批量查询任务状态失败: %s", e)
+            now = time.monotonic()
+            for gid in gids:
+                entry = monitors.get(gid)
+                if entry is None:
+                    continue  # 查询期间已由详情刷新结束监控
+                task = tasks.get(gid)
+                if task is None:
+                    # 查询失败时保留监控下轮重试，超过最长监控时间（24 小时）后放弃
+                    if gid not in tasks and now < entry[1]:
+                        continue
+                    del monitors[gid]  # 任务可能已被删除
+                elif task.status in ("complete", "error", "removed"):
+                    await self._finish_monitor(gid, task)
+                elif now >= entry[1]:
+                    del monitors[gid]
+            if monitors:
+                await asyncio.sleep(MONITOR_POLL_INTERVAL)
+
+    async def _finish_monitor(self, gid: str, task: DownloadTask) -> None:
+        """被监控的任务结束时停止监控，并发送完成/失败通知（由监控循环或详情刷新调用）"""
+        entry = self._download_monitors.pop(gid, None)
+        if entry is None or task.status == "removed" or not self._notified_gids.add_new(gid):
+            return
+        if task.status == "complete":
+            # 完成通知会触发自动上传，放到后台执行，避免阻塞调用方的轮询
+            self._spawn_upload(self._send_completion_notification(entry[0], task))
+        else:
+            await self._send_error_notification(entry[0], task)
 
     async def _send_completion_notification(self, chat_id: int, task: DownloadTask) -> None:
         """发送下载完成通知"""
-        from .app_ref import get_bot_instance
-
         _bot_instance = get_bot_instance()
         if _bot_instance is None:
             return
-        safe_name = task.name.replace("_", "\\_").replace("*", "\\*").replace("`", "\\`")
+        safe_name = task.name.translate(_MD_ESCAPE_TABLE)
         text = f"✅ *下载完成*\n📄 {safe_name}\n📦 大小: {task.size_str}\n🆔 GID: `{task.gid}`"
         try:
             await _bot_instance.send_message(chat_id=chat_id, text=text, parse_mode="Markdown")
             # 触发自动上传（如果配置了的话）
             await self._coordinated_auto_upload(chat_id, task.gid, task, _bot_instance)
         except Exception as e:
-            logger.warning(f"发送完成通知失败 (GID={task.gid}): {e}")
+            logger.warning("发送完成通知失败 (GID=%s): %s", task.gid, e)
 
     async def _send_error_notification(self, chat_id: int, task: DownloadTask) -> None:
         """发送下载失败通知"""
-        from .app_ref import get_bot_instance
-
         _bot_instance = get_bot_instance()
         if _bot_instance is None:
             return
-        safe_name = task.name.replace("_", "\\_").replace("*", "\\*").replace("`", "\\`")
+        safe_name = task.name.translate(_MD_ESCAPE_TABLE)
         text = f"❌ *下载失败*\n📄 {safe_name}\n🆔 GID: `{task.gid}`\n⚠️ 原因: {task.error_message or '未知错误'}"
         try:
             await _bot_instance.send_message(chat_id=chat_id, text=text, parse_mode="Markdown")
         except Exception as e:
-            logger.warning(f"发送失败通知失败 (GID={task.gid}): {e}")
+            logger.warning("发送失败通知失败 (GID=%s): %s", task.gid, e)